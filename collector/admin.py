@@ -1,10 +1,54 @@
 from django.contrib import admin
-from django.utils.html import format_html
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
 from django.contrib import messages
+from django.db import connections
+from django.db.models import OuterRef, Q, Subquery
+from django.db.models.functions import Substr
+from django.contrib.postgres.search import SearchQuery, SearchVector
 from collector.tasks import collect_data_from_all_sources
 from .models import Source, FetchLog, AILog, JobConfig, Article, SystemConfig, Team
 
+# Số ký tự tối đa của các cột text dài được lấy về cho trang danh sách
+PREVIEW_LENGTH = 500
+
+def short_text(value, length=100, title_length=PREVIEW_LENGTH):
+    """Rút gọn text dài cho list_display, tooltip chỉ chứa tối đa title_length ký tự"""
+    if not value:
+        return ''
+    if len(value) <= length:
+        return value
+    return mark_safe(f'<span title="{escape(value[:title_length])}">{escape(value[:length])}&hellip;</span>')
+
+def is_changelist(request, model_admin):
+    """Request hiện tại có phải trang danh sách (changelist) của model_admin không"""
+    opts = model_admin.model._meta
+    match = request.resolver_match
+    return match is not None and match.url_name == f'{opts.app_label}_{opts.model_name}_changelist'
+
+class FullTextSearchMixin:
+    """Tìm kiếm full-text (tsvector + GIN index) trên PostgreSQL cho các cột text dài.
+
+    search_vector_fields chỉ gồm các cột văn bản và phải trùng với index GIN trong migration
+    (0008, 0015). Các trường định danh còn lại của search_fields (url, ...) vẫn tìm bằng icontains.
+    Từ khoá ngắn hoặc DB khác PostgreSQL dùng lại search_fields (icontains).
+    """
+    search_vector_fields = ()
+    search_config = 'simple'
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if (not self.search_vector_fields or len(term) < 3
+                or connections[queryset.db].vendor != 'postgresql'):
+            return super().get_search_results(request, queryset, search_term)
+        vector = SearchVector(*self.search_vector_fields, config=self.search_config)
+        query = Q(_search=SearchQuery(term, search_type='websearch', config=self.search_config))
+        for field in self.search_fields:
+            if field not in self.search_vector_fields:
+                query |= Q(**{f'{field}__icontains': term})
+        return queryset.annotate(_search=vector).filter(query), False
+
 @admin.register(Team)
 class TeamAdmin(admin.ModelAdmin):
     list_display = ('name', 'code', 'is_active', 'created_at', 'updated_at')
@@ -23,6 +67,7 @@ class SourceAdmin(admin.ModelAdmin):
         css = {'all': ('admin/css/custom.css',)}
 
     list_display = ('source', 'url', 'type', 'team', 'is_active', 'fetch_interval', 'force_collect')
+    list_select_related = ('team',)
     search_fields = ('source', 'url')
     list_filter = ('type', 'team', 'is_active', 'force_collect')
     ordering = ['source']
@@ -52,15 +97,16 @@ class SourceAdmin(admin.ModelAdmin):
         app_label = "Data Source Management"
 
 @admin.register(Article)
-class ArticleAdmin(admin.ModelAdmin):
+class ArticleAdmin(FullTextSearchMixin, admin.ModelAdmin):
     class Media:
         css = {'all': ('admin/css/custom.css',)}
 
     list_display = ('title', 'source', 'team_name', 'published_at', 
                    'short_summary', 'short_content', 'short_ai_content', 'is_ai_processed')
+    list_select_related = ('source', 'source__team')
     list_filter = ('source', 'source__team', 'is_ai_processed', 'published_at')
     search_fields = ('title', 'content', 'summary', 'ai_content')
-    date_hierarchy = 'published_at'
+    search_vector_fields = search_fields
     ordering = ('-published_at',)
     
     fields = ('title', 'url', 'source', 'published_at', 
@@ -68,22 +114,27 @@ class ArticleAdmin(admin.ModelAdmin):
              'ai_type', 'ai_content', 'created_at')
     readonly_fields = ('created_at',)
 
+    def get_queryset(self, request):
+        # Danh sách chỉ hiển thị PREVIEW_LENGTH ký tự đầu, không tải toàn bộ các cột text dài
+        qs = super().get_queryset(request).annotate(
+            _content_preview=Substr('content', 1, PREVIEW_LENGTH),
+            _summary_preview=Substr('summary', 1, PREVIEW_LENGTH),
+            _ai_content_preview=Substr('ai_content', 1, PREVIEW_LENGTH),
+        )
+        if is_changelist(request, self):
+            qs = qs.defer('content', 'summary', 'ai_content')
+        return qs
+
     def short_content(self, obj):
-        if obj.content and len(obj.content) > 100:
-            return format_html('<span title="{}">{}&hellip;</span>', obj.content, obj.content[:100])
-        return obj.content or ''
+        return short_text(obj._content_preview)
     short_content.short_description = 'Nội dung'
 
     def short_summary(self, obj):
-        if obj.summary and len(obj.summary) > 100:
-            return format_html('<span title="{}">{}&hellip;</span>', obj.summary, obj.summary[:100])
-        return obj.summary or ''
+        return short_text(obj._summary_preview)
     short_summary.short_description = 'Tóm tắt'
 
     def short_ai_content(self, obj):
-        if obj.ai_content and len(obj.ai_content) > 100:
-            return format_html('<span title="{}">{}&hellip;</span>', obj.ai_content, obj.ai_content[:100])
-        return obj.ai_content or ''
+        return short_text(obj._ai_content_preview)
     short_ai_content.short_description = 'Nội dung AI'
 
     def team_name(self, obj):
@@ -95,9 +146,9 @@ class ArticleAdmin(admin.ModelAdmin):
 class FetchLogAdmin(admin.ModelAdmin):
     list_display = ('fetched_at', 'source', 'team_name', 'status', 'articles_count', 
                    'execution_time', 'error_message')
+    list_select_related = ('source', 'source__team')
     list_filter = ('status', 'source', 'source__team', 'fetched_at')
     search_fields = ('error_message', 'source__source')
-    date_hierarchy = 'fetched_at'
     readonly_fields = [f.name for f in FetchLog._meta.fields]
     
     def team_name(self, obj):
@@ -106,41 +157,45 @@ class FetchLogAdmin(admin.ModelAdmin):
     team_name.admin_order_field = 'source__team__name'
 
 @admin.register(AILog)
-class AILogAdmin(admin.ModelAdmin):
+class AILogAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ('created_at', 'url', 'get_team_name', 'status', 'error_message', 
                    'short_prompt', 'short_result')
     search_fields = ('url', 'prompt', 'result', 'error_message')
+    search_vector_fields = ('prompt', 'result', 'error_message')
     list_filter = ('status', 'created_at')
     readonly_fields = [f.name for f in AILog._meta.fields]
-    date_hierarchy = 'created_at'
     
     # Thêm fields để hiển thị trong form
     fields = ('url', 'prompt', 'response', 'result', 'status', 
              'error_message', 'created_at')
 
     def short_prompt(self, obj):
-        if len(obj.prompt) > 100:
-            return format_html('<span title="{}">{}&hellip;</span>', obj.prompt, obj.prompt[:100])
-        return obj.prompt
+        return short_text(obj._prompt_preview)
     short_prompt.short_description = 'Prompt'
 
     def short_result(self, obj):
-        if len(obj.result) > 100:
-            return format_html('<span title="{}">{}&hellip;</span>', obj.result, obj.result[:100])
-        return obj.result
+        return short_text(obj._result_preview)
     short_result.short_description = 'Result'
     
+    def get_queryset(self, request):
+        # Lấy tên team của article cùng URL bằng subquery, tránh mỗi dòng một query;
+        # prompt/result chỉ lấy PREVIEW_LENGTH ký tự đầu cho trang danh sách
+        qs = super().get_queryset(request).annotate(
+            _team_name=Subquery(
+                Article.objects.filter(url=OuterRef('url')).values('source__team__name')[:1]
+            ),
+            _prompt_preview=Substr('prompt', 1, PREVIEW_LENGTH),
+            _result_preview=Substr('result', 1, PREVIEW_LENGTH),
+        )
+        if is_changelist(request, self):
+            qs = qs.defer('prompt', 'response', 'result')
+        return qs
+
     def get_team_name(self, obj):
         """Lấy tên team từ article thông qua URL"""
-        try:
-            article = Article.objects.filter(url=obj.url).first()
-            if article and article.source and article.source.team:
-                return article.source.team.name
-        except:
-            pass
-        return '-'
+        return obj._team_name or '-'
     get_team_name.short_description = 'Team'
-    get_team_name.admin_order_field = 'url'  # Cho phép sắp xếp theo URL
+    get_team_name.admin_order_field = '_team_name'  # Cho phép sắp xếp theo team
 
 @admin.register(JobConfig)
 class JobConfigAdmin(admin.ModelAdmin):
@@ -161,6 +216,7 @@ class JobConfigAdmin(admin.ModelAdmin):
 @admin.register(SystemConfig)
 class SystemConfigAdmin(admin.ModelAdmin):
     list_display = ('key', 'team', 'get_masked_value', 'is_active', 'updated_at')
+    list_select_related = ('team',)
     list_filter = ('key', 'team', 'is_active')
     search_fields = ('key', 'description', 'value')
     readonly_fields = ('created_at', 'updated_at', 'key_type')
@@ -183,22 +239,30 @@ class SystemConfigAdmin(admin.ModelAdmin):
         return obj.value
     get_masked_value.short_description = 'Value'
 
+# Thứ tự hiển thị các model của app collector trong admin
+_MODEL_ORDER = {
+    'Team': 1,
+    'Source': 2,
+    'Article': 3,
+    'FetchLog': 4,
+    'AILog': 5,
+    'JobConfig': 6,
+    'SystemConfig': 7,
+}
+
+_default_get_app_list = admin.AdminSite.get_app_list
+
 def get_app_list(self, request, app_label=None):
     """Tùy chỉnh thứ tự hiển thị các model trong admin"""
+    if app_label and app_label != 'collector':
+        return _default_get_app_list(self, request, app_label)
+
     app_dict = self._build_app_dict(request, app_label)
     app_list = sorted(app_dict.values(), key=lambda x: x['name'].lower())
 
     for app in app_list:
         if app['app_label'] == 'collector':
-            app['models'].sort(key=lambda x: {
-                'Team': 1,
-                'Source': 2,
-                'Article': 3,
-                'FetchLog': 4,
-                'AILog': 5,
-                'JobConfig': 6,
-                'SystemConfig': 7,
-            }.get(x['object_name'], 10))
+            app['models'].sort(key=lambda x: _MODEL_ORDER.get(x['object_name'], 10))
     return app_list
 
 admin.AdminSite.get_app_list = get_app_list
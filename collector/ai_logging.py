@@ -0,0 +1,59 @@
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+AI_LOGGER_NAME = 'collector_ai'
+AI_LOG_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '../logs/collector_ai.log'))
+
+_listener = None
+_queue_handler = None
+
+
+def _start_listener(file_handler):
+    """Tạo queue mới và thread QueueListener ghi record của queue đó ra file"""
+    global _listener
+    log_queue = queue.Queue(-1)
+    _queue_handler.queue = log_queue
+    _listener = QueueListener(log_queue, file_handler)
+    _listener.start()
+
+
+def _restart_listener_after_fork():
+    # Thread không được sao chép khi fork (Celery prefork fork worker sau django.setup()),
+    # nên process con phải tự chạy listener, nếu không record chỉ nằm lại trong queue
+    if _listener is not None:
+        _start_listener(_listener.handlers[0])
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def setup_ai_logger():
+    """Gắn file log riêng cho AI/thumbnail qua QueueHandler.
+
+    Coroutine chỉ đẩy record vào queue; việc ghi file do thread của QueueListener đảm nhận,
+    nên ai_logger.info(...) trong code async không chặn event loop.
+    """
+    global _queue_handler
+    if _queue_handler is not None:
+        return
+
+    os.makedirs(os.path.dirname(AI_LOG_PATH), exist_ok=True)
+    file_handler = logging.FileHandler(AI_LOG_PATH, encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+
+    _queue_handler = QueueHandler(queue.Queue(-1))
+    _start_listener(file_handler)
+    atexit.register(_stop_listener)
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=_restart_listener_after_fork)
+
+    ai_logger = logging.getLogger(AI_LOGGER_NAME)
+    ai_logger.setLevel(logging.INFO)
+    ai_logger.addHandler(_queue_handler)
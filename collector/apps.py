@@ -5,3 +5,7 @@ class CollectorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'collector'
     verbose_name = 'Data Source Management'
+
+    def ready(self):
+        from .ai_logging import setup_ai_logger
+        setup_ai_logger()
@@ -0,0 +1,44 @@
+"""Parse feed bằng feedparser, không phụ thuộc Django để chạy được trong process con."""
+from typing import Dict, List
+
+import feedparser
+from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    HTMLParser = None
+
+# Thẻ không chứa nội dung hiển thị, bỏ trước khi lấy text
+NON_TEXT_TAGS = ['script', 'style']
+
+
+def html_to_text(html: str) -> str:
+    """Chuyển summary dạng HTML sang text thuần; chuỗi không có thẻ/entity trả về nguyên vẹn"""
+    if not html or ('<' not in html and '&' not in html):
+        return html or ''
+    if HTMLParser is None:
+        soup = BeautifulSoup(html, 'lxml')
+        for tag in soup(NON_TEXT_TAGS):
+            tag.decompose()
+        return soup.get_text(' ', strip=True)
+    tree = HTMLParser(html)
+    tree.strip_tags(NON_TEXT_TAGS)
+    return tree.body.text(separator=' ', strip=True) if tree.body is not None else ''
+
+
+def parse_feed_entries(xml_data: bytes, max_entries: int) -> List[Dict[str, str]]:
+    """Trả về tối đa max_entries item dạng dict thuần (title, url, published, summary, content)"""
+    # Bỏ 2 bước chậm nhất của feedparser; summary được chuyển sang text thuần bằng html_to_text
+    feed = feedparser.parse(xml_data, sanitize_html=False, resolve_relative_uris=False)
+    return [
+        {
+            'title': item.get('title', ''),
+            'url': item.get('link', ''),
+            'published': item.get('published', ''),
+            'summary': html_to_text(item.get('summary', '')),
+            # content:encoded / Atom content, giữ nguyên HTML
+            'content': item['content'][0].get('value', '') if item.get('content') else '',
+        }
+        for item in feed.entries[:max_entries]
+    ]
@@ -1,113 +1,403 @@
 import asyncio
 import aiohttp
-import feedparser
+import atexit
+import hashlib
+import multiprocessing
+import os
+import ijson
+import re
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager, nullcontext
+from dataclasses import dataclass
+from functools import lru_cache, partial, wraps
 from datetime import datetime, timezone, timedelta
 from typing import List, Dict, Any, Optional
 from email.utils import parsedate_to_datetime
+from urllib.parse import urljoin
+from feedparser.datetimes import _parse_date as feedparser_parse_date
 
 import ssl
 import certifi
+from lxml import etree
 
 from .utils import get_agentql_api_key_async
 
+from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone as django_timezone
 from django.db import models  # Thêm import này
 from asgiref.sync import sync_to_async
 
-from .models import Source, Article, FetchLog, AILog
+from .models import Source, Article, FetchLog, AILog, article_url_hash
+from .ai_logging import AI_LOGGER_NAME
+from .feed_parsing import html_to_text, parse_feed_entries
 import logging
 
 # Thêm import cho BeautifulSoup
 from bs4 import BeautifulSoup
 
+# selectolax (C) nhanh hơn nhiều khi parse HTML, không có thì dùng BeautifulSoup + lxml
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    HTMLParser = None
+
+# ciso8601 (C) parse ISO 8601 nhanh hơn datetime.fromisoformat, không có thì dùng fromisoformat
+try:
+    from ciso8601 import parse_datetime as parse_iso_datetime
+except ImportError:
+    parse_iso_datetime = None
+
 # Thêm import cho gọi API AI
-import json
-import os
+import orjson
 from django.db.models import Q
-from django.db import transaction
+from django.db import close_old_connections, connections, transaction
 
 logger = logging.getLogger(__name__)
 
-# Thiết lập logger lưu file riêng cho AI/thumbnail
-ai_log_path = os.path.join(os.path.dirname(__file__), '../logs/collector_ai.log')
-ai_log_path = os.path.abspath(ai_log_path)
-os.makedirs(os.path.dirname(ai_log_path), exist_ok=True)
-ai_logger = logging.getLogger('collector_ai')
-ai_logger.setLevel(logging.INFO)
-if not ai_logger.handlers:
-    file_handler = logging.FileHandler(ai_log_path, encoding='utf-8')
-    formatter = logging.Formatter('%(asctime)s %(levelname)s %(message)s')
-    file_handler.setFormatter(formatter)
-    ai_logger.addHandler(file_handler)
+# Logger lưu file riêng cho AI/thumbnail (handler được gắn trong CollectorConfig.ready)
+ai_logger = logging.getLogger(AI_LOGGER_NAME)
 
 # SSL context chuẩn dùng certifi
 ssl_context = ssl.create_default_context(cafile=certifi.where())
 
-# Wrappers để gọi ORM an toàn trong async
-create_article = sync_to_async(Article.objects.get_or_create, thread_sensitive=True)
-update_source_last_fetched = sync_to_async(Source.save, thread_sensitive=True)
-create_fetch_log = sync_to_async(FetchLog.objects.create, thread_sensitive=True)
-create_ailog = sync_to_async(AILog.objects.create, thread_sensitive=True)
+# Namespace của các định dạng feed được parse trực tiếp bằng lxml
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+RDF_NS = '{http://www.w3.org/1999/02/22-rdf-syntax-ns#}'
+RSS1_NS = '{http://purl.org/rss/1.0/}'
+DC_NS = '{http://purl.org/dc/elements/1.1/}'
+CONTENT_NS = '{http://purl.org/rss/1.0/modules/content/}'
+
+# Kích thước mỗi chunk khi đọc feed theo luồng
+FEED_CHUNK_SIZE = 64 * 1024
+# Giới hạn dung lượng body để feed lỗi cấu hình không làm tràn bộ nhớ
+FEED_MAX_BYTES = 50 * 1024 * 1024
+# Trang chi tiết chỉ đọc và parse phần đầu: nội dung gửi AI tối đa DETAIL_MAX_CONTENT_LENGTH ký tự,
+# phần sau thường là script/ảnh base64 nhúng
+DETAIL_MAX_BYTES = 512 * 1024
+# Số item tối đa đọc từ một feed (ghi đè bằng params['max_entries'] của nguồn)
+DEFAULT_FEED_MAX_ENTRIES = 50
+# Nội dung đầy đủ trong feed (content:encoded / Atom content) dài từ mức này được lưu làm Article.content,
+# không cần cào lại trang chi tiết
+FEED_FULL_CONTENT_MIN_LENGTH = 1500
+
+# Thẻ gốc của feed -> thẻ của từng bài viết
+FEED_ITEM_TAGS = {
+    'rss': 'item',
+    f'{RDF_NS}RDF': f'{RSS1_NS}item',
+    f'{ATOM_NS}feed': f'{ATOM_NS}entry',
+}
+
+# Tên thẻ (title, link, description) của item RSS 2.0 / RSS 1.0, dựng sẵn một lần
+RSS2_ITEM_FIELDS = ('title', 'link', 'description')
+RSS1_ITEM_FIELDS = (f'{RSS1_NS}title', f'{RSS1_NS}link', f'{RSS1_NS}description')
+DC_DATE = f'{DC_NS}date'
+CONTENT_ENCODED = f'{CONTENT_NS}encoded'
+ATOM_TITLE = f'{ATOM_NS}title'
+ATOM_LINK = f'{ATOM_NS}link'
+ATOM_ALTERNATE_LINK = f"{ATOM_NS}link[@rel='alternate']"
+ATOM_PUBLISHED = f'{ATOM_NS}published'
+ATOM_UPDATED = f'{ATOM_NS}updated'
+ATOM_SUMMARY = f'{ATOM_NS}summary'
+ATOM_CONTENT = f'{ATOM_NS}content'
+
+# Cấu hình ClientSession dùng chung cho các fetcher
+HTTP_CONNECTION_LIMIT = 256
+HTTP_CONNECTION_LIMIT_PER_HOST = 8
+HTTP_DNS_CACHE_TTL = 600
+# Giữ kết nối rảnh lâu hơn mặc định (15s) để lượt sau còn dùng lại được
+HTTP_KEEPALIVE_TIMEOUT = 60
+# Timeout mặc định cho mọi request; kết nối không được quá 10s dù tổng thời gian còn dư
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=30, connect=10)
+# Trang chi tiết cần nhanh hơn, còn AI sinh nội dung lâu hơn mặc định
+DETAIL_HTTP_TIMEOUT = aiohttp.ClientTimeout(total=15, connect=10)
+AI_HTTP_TIMEOUT = aiohttp.ClientTimeout(total=60, connect=10)
+# Thời gian tối đa cho một lần fetch nguồn (kể cả retry), để một nguồn treo không kéo dài cả lượt
+SOURCE_FETCH_TIMEOUT = 120
+# Thử lại khi server báo quá tải (429/503), ưu tiên thời gian chờ trong Retry-After
+HTTP_RETRY_STATUSES = (429, 503)
+HTTP_MAX_RETRIES = 3
+HTTP_RETRY_BACKOFF = 1
+HTTP_MAX_RETRY_DELAY = 60
+# Lỗi mạng tạm thời cũng được thử lại (backoff luỹ thừa); giới hạn theo host đã có ở limit_per_host của connector
+HTTP_RETRY_ERRORS = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+HTTP_IDEMPOTENT_METHODS = ('GET', 'HEAD')
+
+
+def create_client_session() -> aiohttp.ClientSession:
+    """Tạo ClientSession có connection pool, DNS cache và timeout mặc định"""
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            ssl=ssl_context,
+            limit=HTTP_CONNECTION_LIMIT,
+            limit_per_host=HTTP_CONNECTION_LIMIT_PER_HOST,
+            ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+            enable_cleanup_closed=True,
+        ),
+        timeout=HTTP_TIMEOUT,
+        # aiohttp cần serializer trả về str, orjson trả về bytes
+        json_serialize=lambda obj: orjson.dumps(obj).decode(),
+    )
+
+
+def _can_retry_error(method: str, error: Exception) -> bool:
+    """Chưa kết nối được thì luôn thử lại; lỗi giữa chừng chỉ thử lại với request idempotent (tránh gửi POST hai lần)"""
+    return isinstance(error, aiohttp.ClientConnectorError) or method.upper() in HTTP_IDEMPOTENT_METHODS
+
+
+def _retry_delay(response: aiohttp.ClientResponse, attempt: int) -> float:
+    """Số giây chờ trước lần thử lại: theo Retry-After nếu có, không thì backoff luỹ thừa"""
+    retry_after = response.headers.get('Retry-After', '').strip()
+    delay = HTTP_RETRY_BACKOFF * 2 ** attempt
+    if retry_after.isdigit():
+        delay = int(retry_after)
+    elif retry_after:
+        try:
+            delay = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            pass
+    return min(max(delay, 0), HTTP_MAX_RETRY_DELAY)
+
+
+@asynccontextmanager
+async def request_with_retry(session: aiohttp.ClientSession, method: str, url: str, **kwargs):
+    """Như session.request(), nhưng tự thử lại khi nhận 429/503 hoặc lỗi kết nối/timeout"""
+    for attempt in range(HTTP_MAX_RETRIES + 1):
+        try:
+            response = await session.request(method, url, **kwargs)
+        except HTTP_RETRY_ERRORS as e:
+            if attempt == HTTP_MAX_RETRIES or not _can_retry_error(method, e):
+                raise
+            delay = HTTP_RETRY_BACKOFF * 2 ** attempt
+            logger.warning(f"{method} {url} lỗi {type(e).__name__}: {e}, thử lại sau {delay:.0f}s")
+            await asyncio.sleep(delay)
+            continue
+
+        async with response:
+            if response.status not in HTTP_RETRY_STATUSES or attempt == HTTP_MAX_RETRIES:
+                yield response
+                return
+            delay = _retry_delay(response, attempt)
+        logger.warning(f"{method} {url} -> {response.status}, thử lại sau {delay:.0f}s")
+        await asyncio.sleep(delay)
+
+
+async def read_prefix(response: aiohttp.ClientResponse, max_bytes: int) -> bytes:
+    """Đọc tối đa max_bytes đầu tiên của body, bỏ phần còn lại (không tải tiếp)"""
+    chunks = []
+    remaining = max_bytes
+    async for chunk in response.content.iter_chunked(FEED_CHUNK_SIZE):
+        chunks.append(chunk[:remaining])
+        remaining -= len(chunk)
+        if remaining <= 0:
+            break
+    return b''.join(chunks)
+
+
+@asynccontextmanager
+async def use_client_session(session: Optional[aiohttp.ClientSession] = None):
+    """Dùng lại session được truyền vào, nếu không có thì tạo session tạm"""
+    if session is not None and not session.closed:
+        yield session
+        return
+    async with create_client_session() as new_session:
+        yield new_session
+
+def run_in_db_thread(func):
+    """Bọc hàm ORM đồng bộ để await trên thread pool (thread_sensitive=False).
+
+    Thread của pool không đi qua vòng đời request nên phải tự dọn kết nối DB sau mỗi lần gọi
+    (close_old_connections: đóng kết nối lỗi hoặc quá CONN_MAX_AGE, giữ kết nối còn dùng được).
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(wrapper, thread_sensitive=False)
+
+
+# SQLite chỉ cho một writer: transaction đọc rồi mới ghi của hai thread sẽ báo "database is locked"
+# ngay (không chờ timeout), nên các thread ghi bài xếp hàng ở đây. DB khác không cần khoá.
+_sqlite_write_lock = threading.Lock()
+
+
+def sqlite_write_lock():
+    if connections['default'].vendor == 'sqlite':
+        return _sqlite_write_lock
+    return nullcontext()
+
+
+@dataclass(slots=True)
+class FetchedArticle:
+    """Một bài viết lấy được từ nguồn, chưa lưu DB (slots: không có __dict__ cho từng item)"""
+    title: str
+    url: str
+    source: Source
+    published_at: datetime
+    summary: str = ''
+    # HTML nội dung đầy đủ nếu feed có; chỉ chuyển sang text cho bài thực sự được lưu
+    content: str = ''
 
 
 class BaseFetcher:
     """Base class for all fetchers"""
 
-    def __init__(self, source: Source):
+    def __init__(self, source: Source, session: aiohttp.ClientSession):
         self.source = source
+        self.session = session
+        # Cache ngày đã parse trong một lượt fetch: nhiều feed dùng chung một vài mốc thời gian cho mọi item
+        self._date_cache: Dict[str, datetime] = {}
 
-    async def fetch(self) -> List[Dict[str, Any]]:
+    async def fetch(self) -> List[FetchedArticle]:
         """Override this method in subclasses"""
         raise NotImplementedError
 
-    def parse_date(self, date_str: str) -> datetime:
-        """Parse RFC-822 or ISO date string to datetime (with tz)."""
+    def parse_date(self, date_str: str, now: Optional[datetime] = None) -> datetime:
+        """Parse RFC-822 or ISO date string to datetime (with tz).
+
+        `now` là giờ fallback, nên lấy một lần cho cả lượt parse thay vì gọi lại cho từng item.
+        """
+        now = now or django_timezone.now()
+        if not date_str:
+            return now
+
         try:
-            if not date_str:
-                return django_timezone.now()
+            # fallback: giờ hiện tại (không cache)
+            return _parse_date_cached(date_str) or now
+
+        except Exception as e:
+            logger.warning(f"Date parsing failed for '{date_str}': {e}")
+            return now
+
+    def _published_at(self, date_str: str, now: datetime) -> datetime:
+        """Như parse_date nhưng dùng cache của lượt fetch hiện tại; chuỗi rỗng trả về luôn `now`"""
+        if not date_str:
+            return now
+        published_at = self._date_cache.get(date_str)
+        if published_at is None:
+            published_at = self._date_cache[date_str] = self.parse_date(date_str, now)
+        return published_at
+
+
+# Regex fast-path cho 2 dạng ngày phổ biến nhất trong feed
+ISO_DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}')
+RFC822_DATE_RE = re.compile(
+    r'(?:[A-Za-z]{3},\s*)?(\d{1,2})\s+([A-Za-z]{3})\s+(\d{4})\s+'
+    r'(\d{1,2}):(\d{2})(?::(\d{2}))?\s*([+-]\d{4}|[A-Za-z]{1,3})?\s*$'
+)
+RFC822_MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+# tzinfo dựng sẵn cho các múi giờ dạng chữ hay gặp
+RFC822_TZINFOS = {
+    name: timezone(timedelta(hours=hours))
+    for name, hours in {
+        'UT': 0, 'UTC': 0, 'GMT': 0, 'Z': 0,
+        'EST': -5, 'EDT': -4, 'CST': -6, 'CDT': -5,
+        'MST': -7, 'MDT': -6, 'PST': -8, 'PDT': -7,
+    }.items()
+}
+
+
+@lru_cache(maxsize=64)
+def _fixed_offset_tz(offset: str) -> timezone:
+    """tzinfo cho offset dạng "+0700" (dùng lại giữa các bài cùng feed)"""
+    delta = timedelta(hours=int(offset[1:3]), minutes=int(offset[3:5]))
+    return timezone(-delta if offset[0] == '-' else delta)
+
+
+def _parse_rfc822(match: 're.Match') -> Optional[datetime]:
+    """Dựng datetime trực tiếp từ kết quả RFC822_DATE_RE, None nếu không hợp lệ"""
+    day, mon, year, hour, minute, second, tz = match.groups()
+    month = RFC822_MONTHS.get(mon.lower())
+    if month is None:
+        return None
+
+    if not tz:
+        tzinfo = timezone.utc
+    elif tz[0] in '+-':
+        tzinfo = _fixed_offset_tz(tz)
+    else:
+        tzinfo = RFC822_TZINFOS.get(tz.upper())
+        if tzinfo is None:
+            return None
+
+    try:
+        return datetime(
+            int(year), month, int(day), int(hour), int(minute), int(second or 0),
+            tzinfo=tzinfo,
+        )
+    except ValueError:
+        return None
 
-            # 1) ISO 8601 (e.g. "2025-05-23T21:27:59Z")
-            try:
-                return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-            except ValueError:
-                pass
 
-            # 2) RFC-822 (e.g. "Fri, 23 May 2025 21:27:59 +0000")
+@lru_cache(maxsize=4096)
+def _parse_date_cached(date_str: str) -> Optional[datetime]:
+    """Parse chuỗi ngày (có cache theo chuỗi gốc), trả về None nếu không nhận dạng được"""
+    date_str = date_str.strip()
+
+    # 1) ISO 8601 (e.g. "2025-05-23T21:27:59Z")
+    if ISO_DATE_RE.match(date_str):
+        if parse_iso_datetime is not None:
             try:
-                return parsedate_to_datetime(date_str)
-            except (TypeError, ValueError):
+                return parse_iso_datetime(date_str)
+            except ValueError:
                 pass
+        if date_str.endswith('Z'):
+            date_str = date_str[:-1] + '+00:00'
+        try:
+            return datetime.fromisoformat(date_str)
+        except ValueError:
+            pass
+
+    # 2) RFC-822 (e.g. "Fri, 23 May 2025 21:27:59 +0000")
+    match = RFC822_DATE_RE.match(date_str)
+    if match:
+        parsed = _parse_rfc822(match)
+        if parsed:
+            return parsed
+
+    # Dạng RFC-822 khác (vd. năm 2 chữ số); chỉ thử khi có dấu phẩy sau tên thứ
+    if ',' in date_str:
+        try:
+            return parsedate_to_datetime(date_str)
+        except (TypeError, ValueError):
+            pass
 
-            # 3) fallback: giờ hiện tại
-            return django_timezone.now()
-
-        except Exception as e:
-            logger.warning(f"Date parsing failed for '{date_str}': {e}")
-            return django_timezone.now()
+    # 3) Các dạng hiếm gặp khác: để feedparser xử lý (trả về struct_time UTC)
+    parsed = feedparser_parse_date(date_str)
+    if parsed:
+        return datetime(*parsed[:6], tzinfo=timezone.utc)
+    return None
 
 
 class RSSFetcher(BaseFetcher):
     """Fetcher for RSS feeds"""
 
-    async def fetch(self) -> List[Dict[str, Any]]:
+    async def fetch(self) -> List[FetchedArticle]:
         articles = []
+        # Conditional GET: feed không đổi thì server trả 304, không cần tải và parse lại
+        headers = {}
+        if self.source.etag:
+            headers['If-None-Match'] = self.source.etag
+        if self.source.last_modified:
+            headers['If-Modified-Since'] = self.source.last_modified
+
         try:
-            async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=ssl_context)) as session:
-                async with session.get(self.source.url) as response:
-                    if response.status == 200:
-                        xml_data = await response.text()
-                        feed = feedparser.parse(xml_data)
-
-                        for item in feed.entries:
-                            article_data = {
-                                'title': item.get('title', ''),
-                                'url': item.get('link', ''),
-                                'source': self.source,
-                                'published_at': self.parse_date(item.get('published', '')),
-                                'summary': item.get('summary', '')
-                            }
-                            articles.append(article_data)
+            async with request_with_retry(self.session, 'GET', self.source.url, headers=headers) as response:
+                if response.status == 304:
+                    return articles
+                if response.status == 200:
+                    self.source.etag = response.headers.get('ETag', '')[:255]
+                    self.source.last_modified = response.headers.get('Last-Modified', '')[:64]
+                    articles = await self._parse_stream(response.content)
 
         except Exception as e:
             logger.error(f"RSS fetch error for {self.source.source}: {e}")
@@ -115,25 +405,242 @@ class RSSFetcher(BaseFetcher):
 
         return articles
 
+    async def _parse_stream(self, stream) -> List[FetchedArticle]:
+        """Parse RSS 2.0 / RSS 1.0 / Atom theo từng chunk ngay khi tải về, định dạng khác thì dùng feedparser"""
+        now = django_timezone.now()
+        # Không resolve entity / tải DTD từ mạng
+        parser = etree.XMLPullParser(events=('start', 'end'), resolve_entities=False, no_network=True)
+        self._root_tag = None
+        self._date_cache = {}
+        max_entries = (self.source.params or {}).get('max_entries') or DEFAULT_FEED_MAX_ENTRIES
+        articles = []
+        # Giữ lại dữ liệu thô để fallback sang feedparser khi XML lỗi hoặc định dạng lạ
+        chunks = []
+        streaming = True
+
+        total_bytes = 0
+        async for chunk in stream.iter_chunked(FEED_CHUNK_SIZE):
+            total_bytes += len(chunk)
+            if total_bytes > FEED_MAX_BYTES:
+                raise ValueError(f"Feed vượt quá giới hạn {FEED_MAX_BYTES} bytes")
+            chunks.append(chunk)
+            if streaming:
+                try:
+                    parser.feed(chunk)
+                    streaming = self._read_feed_events(parser, articles, now, max_entries)
+                except etree.XMLSyntaxError:
+                    streaming = False
+                # Đủ số item cần lấy (feed thường xếp bài mới trước): bỏ phần còn lại, không tải tiếp
+                if streaming and len(articles) >= max_entries:
+                    return articles
+
+        if streaming:
+            try:
+                parser.close()
+                streaming = self._read_feed_events(parser, articles, now, max_entries)
+            except etree.XMLSyntaxError:
+                streaming = False
+
+        if streaming:
+            return articles
+        return await self._parse_with_feedparser(b''.join(chunks), max_entries)
+
+    def _read_feed_events(self, parser, articles: List[FetchedArticle], now: datetime, max_entries: int) -> bool:
+        """Lấy các item đã parse xong từ parser, trả về False nếu không phải RSS/Atom"""
+        for event, elem in parser.read_events():
+            if self._root_tag is None:
+                self._root_tag = elem.tag
+                if self._root_tag not in FEED_ITEM_TAGS:
+                    return False
+                # Chọn hàm parse theo định dạng feed một lần, không rẽ nhánh lại cho từng item
+                self._item_tag = FEED_ITEM_TAGS[self._root_tag]
+                if self._root_tag == 'rss':
+                    self._parse_item = partial(self._parse_rss_item, fields=RSS2_ITEM_FIELDS)
+                elif self._root_tag == f'{RDF_NS}RDF':
+                    self._parse_item = partial(self._parse_rss_item, fields=RSS1_ITEM_FIELDS)
+                else:
+                    self._parse_item = self._parse_atom_entry
+                continue
+            if event != 'end' or elem.tag != self._item_tag:
+                continue
+
+            articles.append(self._parse_item(elem, now))
+            if len(articles) >= max_entries:
+                break
+
+            # Giải phóng item đã parse để giữ bộ nhớ ổn định với feed lớn
+            elem.clear(keep_tail=True)
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+        return True
+
+    def _absolute_url(self, link: str) -> str:
+        """Link tương đối (bắt đầu bằng '/') được ghép với url của nguồn"""
+        link = link.strip()
+        if link.startswith('/') and not link.startswith('//'):
+            return urljoin(self.source.url, link)
+        return link
+
+    def _parse_rss_item(self, item, now: datetime, fields=RSS2_ITEM_FIELDS) -> FetchedArticle:
+        title_tag, link_tag, description_tag = fields
+        published = item.findtext('pubDate') or item.findtext(DC_DATE) or ''
+        return FetchedArticle(
+            title=(item.findtext(title_tag) or '').strip(),
+            url=self._absolute_url(item.findtext(link_tag) or ''),
+            source=self.source,
+            published_at=self._published_at(published.strip(), now),
+            summary=html_to_text((item.findtext(description_tag) or '').strip()),
+            content=item.findtext(CONTENT_ENCODED) or '',
+        )
+
+    def _parse_atom_entry(self, entry, now: datetime) -> FetchedArticle:
+        link = entry.find(ATOM_ALTERNATE_LINK)
+        if link is None:
+            link = entry.find(ATOM_LINK)
+        published = entry.findtext(ATOM_PUBLISHED) or entry.findtext(ATOM_UPDATED) or ''
+        summary = entry.findtext(ATOM_SUMMARY) or entry.findtext(ATOM_CONTENT) or ''
+        return FetchedArticle(
+            title=(entry.findtext(ATOM_TITLE) or '').strip(),
+            url=self._absolute_url(link.get('href', '') if link is not None else ''),
+            source=self.source,
+            published_at=self._published_at(published.strip(), now),
+            summary=html_to_text(summary.strip()),
+            content=entry.findtext(ATOM_CONTENT) or '',
+        )
+
+    async def _parse_with_feedparser(self, xml_data: bytes, max_entries: int = DEFAULT_FEED_MAX_ENTRIES) -> List[FetchedArticle]:
+        # feedparser chậm: feed lớn parse ở process riêng (không giữ GIL), feed nhỏ parse trong thread
+        pool = get_parse_pool() if len(xml_data) >= PROCESS_PARSE_MIN_BYTES else None
+        entries = None
+        if pool is not None:
+            loop = asyncio.get_running_loop()
+            try:
+                entries = await loop.run_in_executor(pool, parse_feed_entries, xml_data, max_entries)
+            except BrokenProcessPool as e:
+                # Process con chết (OOM, bị kill): bỏ pool hỏng, lần sau tạo lại; feed này parse trong thread
+                logger.warning(f"Parse pool bị hỏng, parse {self.source.source} trong thread: {e}")
+                reset_parse_pool(pool)
+        if entries is None:
+            entries = await asyncio.to_thread(parse_feed_entries, xml_data, max_entries)
+
+        now = django_timezone.now()
+        return [
+            FetchedArticle(
+                title=entry['title'],
+                url=entry['url'],
+                source=self.source,
+                published_at=self._published_at(entry['published'], now),
+                summary=entry['summary'],
+                content=entry['content'],
+            )
+            for entry in entries
+        ]
+
+
+# Feed (fallback feedparser) từ kích thước này trở lên được parse trong process pool
+PROCESS_PARSE_MIN_BYTES = 100 * 1024
+# Chỉ dùng cho fallback feedparser với feed lớn nên vài process là đủ
+PARSE_POOL_MAX_WORKERS = 2
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()
+
+
+def get_parse_pool() -> Optional[ProcessPoolExecutor]:
+    """Process pool dùng chung cho việc parse feed.
+
+    Trả về None trong process daemon (vd. worker Celery prefork) vì không được tạo process con.
+    Dùng spawn thay vì fork: process hiện tại đang chạy nhiều thread (event loop, thread pool DB,
+    QueueListener), fork lúc đó có thể sao chép lock đang bị giữ và treo process con.
+    """
+    global _parse_pool
+    if multiprocessing.current_process().daemon:
+        return None
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            _parse_pool = ProcessPoolExecutor(
+                max_workers=min(PARSE_POOL_MAX_WORKERS, os.cpu_count() or 1),
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _parse_pool
+
+
+def reset_parse_pool(pool: ProcessPoolExecutor) -> None:
+    """Bỏ pool đã hỏng (BrokenProcessPool) để get_parse_pool tạo pool mới"""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is pool:
+            _parse_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+@atexit.register
+def shutdown_parse_pool() -> None:
+    global _parse_pool
+    with _parse_pool_lock:
+        pool, _parse_pool = _parse_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+# Các key chứa danh sách bài viết trong response API, theo thứ tự ưu tiên
+API_ITEM_KEYS = ('items', 'articles', 'data')
+
+
+async def stream_api_items(stream) -> List[Any]:
+    """Parse JSON theo luồng bằng ijson, chỉ dựng các phần tử của mảng items/articles/data"""
+    found = {}
+    builder = None
+    depth = 0
+    key = None
+    async for prefix, event, value in ijson.parse_async(stream):
+        if builder is not None:
+            builder.event(event, value)
+            if event in ('start_map', 'start_array'):
+                depth += 1
+            elif event in ('end_map', 'end_array'):
+                depth -= 1
+                if depth == 0:
+                    found[key].append(builder.value)
+                    builder = None
+            continue
+
+        if prefix in API_ITEM_KEYS and event == 'start_array':
+            found.setdefault(prefix, [])
+            continue
+        key, _, rest = prefix.partition('.')
+        if rest != 'item' or key not in API_ITEM_KEYS:
+            continue
+        if event in ('start_map', 'start_array'):
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            depth = 1
+        else:
+            found[key].append(value)
+
+    for key in API_ITEM_KEYS:
+        if key in found:
+            return found[key]
+    return []
+
 
 class APIFetcher(BaseFetcher):
     """Fetcher for API endpoints"""
 
-    async def fetch(self) -> List[Dict[str, Any]]:
+    async def fetch(self) -> List[FetchedArticle]:
         articles = []
         params = self.source.params or {}
         headers = params.get('headers', {})
 
         try:
-            async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=ssl_context)) as session:
-                async with session.get(
-                    self.source.url,
-                    headers=headers,
-                    params=params.get('query_params', {})
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        articles = self._parse_api_response(data)
+            async with request_with_retry(
+                self.session, 'GET', self.source.url,
+                headers=headers,
+                params=params.get('query_params', {})
+            ) as response:
+                if response.status == 200:
+                    # Parse dần theo luồng, không giữ toàn bộ payload trong bộ nhớ
+                    items = await stream_api_items(response.content)
+                    articles = self._parse_api_response(items)
 
         except Exception as e:
             logger.error(f"API fetch error for {self.source.source}: {e}")
@@ -141,27 +648,27 @@ class APIFetcher(BaseFetcher):
 
         return articles
 
-    def _parse_api_response(self, data: Dict) -> List[Dict[str, Any]]:
-        articles = []
-        items = data.get('items', data.get('articles', data.get('data', [])))
-
-        for item in items:
-            article_data = {
-                'title': item.get('title', ''),
-                'url': item.get('url', item.get('link', '')),
-                'source': self.source,
-                'published_at': self.parse_date(item.get('published_at', item.get('pubDate', ''))),
-                'summary': item.get('summary', item.get('description', ''))
-            }
-            articles.append(article_data)
-
-        return articles
+    def _parse_api_response(self, items: List[Dict]) -> List[FetchedArticle]:
+        now = django_timezone.now()
+        source = self.source
+        self._date_cache = {}
+        published_at = self._published_at
+        return [
+            FetchedArticle(
+                title=item.get('title', ''),
+                url=item.get('url', item.get('link', '')),
+                source=source,
+                published_at=published_at(item.get('published_at', item.get('pubDate', '')), now),
+                summary=html_to_text(item.get('summary', item.get('description', ''))),
+            )
+            for item in items
+        ]
 
 
 class AgentQLFetcher(BaseFetcher):
     """Fetcher for static websites using AgentQL"""
     
-    async def fetch(self) -> List[Dict[str, Any]]:
+    async def fetch(self) -> List[FetchedArticle]:
         articles = []
         params = self.source.params or {}
 
@@ -179,15 +686,14 @@ class AgentQLFetcher(BaseFetcher):
                 "X-API-Key": api_key
             }
 
-            async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=ssl_context)) as session:
-                async with session.post(
-                    "https://api.agentql.com/v1/query-data",
-                    json=payload,
-                    headers=headers
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        articles = self._parse_agentql_response(result)
+            async with request_with_retry(
+                self.session, 'POST', "https://api.agentql.com/v1/query-data",
+                data=orjson.dumps(payload),
+                headers=headers
+            ) as response:
+                if response.status == 200:
+                    result = orjson.loads(await response.read())
+                    articles = self._parse_agentql_response(result)
 
         except Exception as e:
             logger.error(f"AgentQL fetch error for {self.source.source}: {e}")
@@ -195,20 +701,26 @@ class AgentQLFetcher(BaseFetcher):
 
         return articles
 
-    def _parse_agentql_response(self, result: Dict) -> List[Dict[str, Any]]:
-        articles = []
-        if result.get('data'):
-            first_key = next(iter(result['data'].keys()))
-            urls = result['data'][first_key] or []
-            for url in urls:
-                articles.append({
-                    'title': f"Article from {self.source.source}",
-                    'url': url,
-                    'source': self.source,
-                    'published_at': django_timezone.now(),
-                    'summary': ''
-                })
-        return articles
+    def _parse_agentql_response(self, result: Dict) -> List[FetchedArticle]:
+        data = result.get('data')
+        if not data:
+            return []
+
+        # params['result_key'] chỉ định key chứa danh sách url, mặc định lấy key đầu tiên
+        result_key = (self.source.params or {}).get('result_key') or next(iter(data))
+        now = django_timezone.now()
+        source = self.source
+        title = f"Article from {source.source}"
+        return [
+            FetchedArticle(
+                title=title,
+                url=url,
+                source=source,
+                published_at=now,
+                summary='',
+            )
+            for url in data.get(result_key) or []
+        ]
 
 
 class FetcherFactory:
@@ -221,15 +733,18 @@ class FetcherFactory:
     }
 
     @classmethod
-    def create_fetcher(cls, source: Source) -> BaseFetcher:
-        fetcher_class = cls.FETCHER_MAP.get(source.type)
-        if not fetcher_class:
-            raise ValueError(f"Unknown source type: {source.type}")
-        return fetcher_class(source)
+    def create_fetcher(cls, source: Source, session: aiohttp.ClientSession) -> BaseFetcher:
+        try:
+            fetcher_class = cls.FETCHER_MAP[source.type]
+        except KeyError:
+            # type đã được kiểm tra theo TYPE_CHOICES khi lưu qua form/admin
+            raise ValueError(f"Unknown source type: {source.type}") from None
+        return fetcher_class(source, session)
 
 
 # Hàm gọi OpenRouter AI để dịch và tóm tắt nội dung sang tiếng Việt
-async def call_openrouter_ai(content: str, url: str, ai_type: str = "dev") -> str:
+async def call_openrouter_ai(content: str, url: str, ai_type: str = "dev",
+                             session: Optional[aiohttp.ClientSession] = None) -> str:
     from .utils import get_openrouter_api_key_async, get_teams_webhook_async
 
     OPENROUTER_API_KEY = await get_openrouter_api_key_async()
@@ -238,7 +753,7 @@ async def call_openrouter_ai(content: str, url: str, ai_type: str = "dev") -> st
         raise Exception("OpenRouter API key not found in configuration")
 
     OPENROUTER_ENDPOINT = "https://openrouter.ai/api/v1/chat/completions"
-    logger.info(f"Using OpenRouter endpoint with key: {OPENROUTER_API_KEY[:10]}...")
+    logger.debug(f"Using OpenRouter endpoint with key: {OPENROUTER_API_KEY[:10]}...")
 
     # Webhook URL cho team tương ứng
     teams_webhook = await get_teams_webhook_async(ai_type)
@@ -271,22 +786,26 @@ async def call_openrouter_ai(content: str, url: str, ai_type: str = "dev") -> st
     }
 
     try:
-        logger.info(f"[OpenRouter] Gửi prompt cho {url}: {prompt[:500]}...")
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=ssl_context)) as session:
-            async with session.post(OPENROUTER_ENDPOINT, headers=headers, json=payload, timeout=60) as resp:
+        logger.info(f"[OpenRouter] Gửi prompt cho {url}")
+        logger.debug("[OpenRouter] Prompt cho %s: %.500s...", url, prompt)
+        async with use_client_session(session) as http:
+            async with http.post(OPENROUTER_ENDPOINT, headers=headers, data=orjson.dumps(payload), timeout=AI_HTTP_TIMEOUT) as resp:
                 if resp.status != 200:
                     error_text = await resp.text()
                     logger.error(f"[OpenRouter] Error response {resp.status}: {error_text}")
                     raise Exception(f"OpenRouter API error: {resp.status} - {error_text}")
 
-                data = await resp.json()
-                logger.info(f"[OpenRouter] Nhận response cho {url}: {str(data)[:500]}...")
+                data = orjson.loads(await resp.read())
+                # str(data) trên cả response khá tốn, chỉ dựng khi bật DEBUG
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"[OpenRouter] Nhận response cho {url}: {str(data)[:500]}...")
 
                 if data.get("choices") and data["choices"][0]["message"].get("content"):
                     result = data["choices"][0]["message"]["content"].strip()
-                    logger.info(f"[OpenRouter] Nội dung dịch cho {url}: {result[:500]}...")
+                    logger.info(f"[OpenRouter] Nhận nội dung dịch cho {url} ({len(result)} ký tự)")
+                    logger.debug("[OpenRouter] Nội dung dịch cho %s: %.500s...", url, result)
                     
-                    # Tạo hàm đồng bộ để gọi create_ailog
+                    # Tạo hàm đồng bộ để ghi AILog
                     def create_log_sync():
                         return AILog.objects.create(
                             url=url,
@@ -302,7 +821,7 @@ async def call_openrouter_ai(content: str, url: str, ai_type: str = "dev") -> st
 
                     if teams_webhook:
                         logger.info(f"[OpenRouter] Sending notification to team {ai_type} for URL: {url}")
-                        await notify_teams(teams_webhook, f"Bài viết mới cho team {ai_type}", result, url)
+                        await notify_teams(teams_webhook, f"Bài viết mới cho team {ai_type}", result, url, session=http)
                     else:
                         logger.warning(f"[OpenRouter] No Teams webhook found for team {ai_type}, skipping notification")
 
@@ -310,7 +829,7 @@ async def call_openrouter_ai(content: str, url: str, ai_type: str = "dev") -> st
                 else:
                     logger.warning(f"[OpenRouter] Không nhận được nội dung dịch cho {url}, trả về content gốc.")
                     
-                    # Tạo hàm đồng bộ để gọi create_ailog
+                    # Tạo hàm đồng bộ để ghi AILog
                     def create_error_log_sync():
                         return AILog.objects.create(
                             url=url,
@@ -333,7 +852,7 @@ async def call_openrouter_ai(content: str, url: str, ai_type: str = "dev") -> st
         except Exception:
             error_response = ''
             
-        # Tạo hàm đồng bộ để gọi create_ailog
+        # Tạo hàm đồng bộ để ghi AILog
         def create_exception_log_sync():
             return AILog.objects.create(
                 url=url,
@@ -350,63 +869,362 @@ async def call_openrouter_ai(content: str, url: str, ai_type: str = "dev") -> st
         return content
 
 
-async def fetch_article_detail(url: str) -> Dict[str, str]:
+# Các phần tử rác bị loại bỏ trước khi lấy nội dung (gộp thành một selector, duyệt cây một lần)
+DETAIL_NOISE_SELECTORS = ("script", "style", "footer", ".ads", ".comments", ".related")
+DETAIL_NOISE_SELECTOR = ",".join(DETAIL_NOISE_SELECTORS)
+# Vùng chứa nội dung chính, theo thứ tự ưu tiên
+DETAIL_ROOT_SELECTORS = ("main", "article", "#content", ".post", ".entry")
+DETAIL_ROOT_SELECTOR = ",".join(DETAIL_ROOT_SELECTORS)
+# Độ dài tối đa của nội dung thô gửi lên AI
+DETAIL_MAX_CONTENT_LENGTH = 4000
+
+
+def _build_raw_content(title: str, meta: str, paragraphs) -> str:
+    """Ghép tiêu đề, mô tả và các đoạn văn; ngừng lấy text khi đã đủ DETAIL_MAX_CONTENT_LENGTH"""
+    parts = [f"{title}\n\n{meta}\n\n"]
+    size = len(parts[0])
+    for i, text in enumerate(paragraphs):
+        if size >= DETAIL_MAX_CONTENT_LENGTH:
+            break
+        if i:
+            parts.append("\n")
+            size += 1
+        parts.append(text)
+        size += len(text)
+    return "".join(parts)[:DETAIL_MAX_CONTENT_LENGTH]
+
+
+def _root_rank(tag: str, node_id: str, classes) -> int:
+    """Vị trí của selector đầu tiên trong DETAIL_ROOT_SELECTORS khớp với node"""
+    for rank, sel in enumerate(DETAIL_ROOT_SELECTORS):
+        if sel[0] == "#":
+            matched = node_id == sel[1:]
+        elif sel[0] == ".":
+            matched = sel[1:] in classes
+        else:
+            matched = tag == sel
+        if matched:
+            return rank
+    return len(DETAIL_ROOT_SELECTORS)
+
+
+def _collect_meta(tags) -> Dict[str, str]:
+    """Gom các thẻ meta thành dict name/property -> content (giữ giá trị xuất hiện đầu tiên)"""
+    meta = {}
+    for attrs in tags:
+        key = attrs.get("name") or attrs.get("property")
+        if key and attrs.get("content"):
+            meta.setdefault(key, attrs["content"])
+    return meta
+
+
+def extract_article_html(html: str) -> Dict[str, str]:
+    """Lấy nội dung thô và ảnh đại diện từ HTML (selectolax, không có thì BeautifulSoup + lxml)"""
+    if HTMLParser is None:
+        return _extract_article_html_bs4(html)
+
+    tree = HTMLParser(html)
+    for node in tree.css(DETAIL_NOISE_SELECTOR):
+        node.decompose()
+    # Lấy tất cả ứng viên trong một lần duyệt, rồi chọn theo thứ tự ưu tiên (cùng hạng thì node đứng trước)
+    candidates = tree.css(DETAIL_ROOT_SELECTOR)
+    root = min(
+        candidates,
+        key=lambda node: _root_rank(node.tag, node.attributes.get("id"), (node.attributes.get("class") or "").split()),
+        default=None,
+    ) or tree.body or tree.root
+    title_tag = tree.css_first("title")
+    title = title_tag.text(strip=True) if title_tag else ""
+    meta_tags = _collect_meta(node.attributes for node in tree.css("meta"))
+    meta = meta_tags.get("description", "").strip()
+    paragraphs = (p.text(strip=True) for p in root.css("p"))
+
+    # Ảnh đại diện: ưu tiên meta og:image, sau đó đến ảnh đầu tiên trong root, cuối cùng là ảnh đầu tiên toàn trang
+    thumbnail, thumbnail_from = "", ""
+    if meta_tags.get("og:image"):
+        thumbnail, thumbnail_from = meta_tags["og:image"], "og:image"
+    else:
+        for node, where in ((root.css_first("img"), "first img in root"), (tree.css_first("img"), "first img in page")):
+            if node and node.attributes.get("src"):
+                thumbnail, thumbnail_from = node.attributes["src"], where
+                break
+
+    return {
+        "raw_content": _build_raw_content(title, meta, paragraphs),
+        "thumbnail": thumbnail,
+        "thumbnail_from": thumbnail_from,
+    }
+
+
+def _extract_article_html_bs4(html: str) -> Dict[str, str]:
+    soup = BeautifulSoup(html, "lxml")
+    for tag in soup.select(DETAIL_NOISE_SELECTOR):
+        tag.decompose()
+    candidates = soup.select(DETAIL_ROOT_SELECTOR)
+    root = min(
+        candidates,
+        key=lambda tag: _root_rank(tag.name, tag.get("id"), tag.get("class") or []),
+        default=None,
+    ) or soup
+    title = soup.title.string.strip() if soup.title and soup.title.string else ""
+    meta_tags = _collect_meta(tag.attrs for tag in soup.find_all("meta"))
+    meta = meta_tags.get("description", "").strip()
+    paragraphs = (p.get_text(strip=True) for p in root.find_all("p"))
+
+    thumbnail, thumbnail_from = "", ""
+    if meta_tags.get("og:image"):
+        thumbnail, thumbnail_from = meta_tags["og:image"], "og:image"
+    else:
+        for tag, where in ((root.find("img"), "first img in root"), (soup.find("img"), "first img in page")):
+            if tag and tag.get("src"):
+                thumbnail, thumbnail_from = tag["src"], where
+                break
+
+    return {
+        "raw_content": _build_raw_content(title, meta, paragraphs),
+        "thumbnail": thumbnail,
+        "thumbnail_from": thumbnail_from,
+    }
+
+
+async def scrape_article_detail(url: str, session: Optional[aiohttp.ClientSession] = None) -> Optional[Dict[str, str]]:
+    """Chỉ tải và parse trang bài viết (không gọi AI), trả về None nếu không tải được"""
+    async with use_client_session(session) as http:
+        async with request_with_retry(http, 'GET', url, timeout=DETAIL_HTTP_TIMEOUT) as resp:
+            if resp.status != 200:
+                return None
+            body = await read_prefix(resp, DETAIL_MAX_BYTES)
+            html = body.decode(resp.charset or 'utf-8', errors='replace')
+    # Parse HTML trong thread riêng để không chặn event loop
+    return await asyncio.to_thread(extract_article_html, html)
+
+
+async def summarize_article_detail(url: str, detail: Dict[str, str],
+                                   session: Optional[aiohttp.ClientSession] = None,
+                                   ai_type: str = "dev") -> Dict[str, str]:
+    """Gửi nội dung đã cào lên AI để dịch/tóm tắt sang tiếng Việt dễ hiểu"""
+    ai_content = await call_openrouter_ai(detail["raw_content"], url, ai_type=ai_type, session=session)
+    ai_logger.info(f"AI summary for {url}: {ai_content[:200]}...")
+    if detail["thumbnail"]:
+        ai_logger.info(f"Thumbnail {detail['thumbnail_from']} for {url}: {detail['thumbnail']}")
+    return {"content": ai_content, "thumbnail": detail["thumbnail"]}
+
+
+async def fetch_article_detail(url: str, session: Optional[aiohttp.ClientSession] = None,
+                               ai_type: str = "dev") -> Dict[str, str]:
     """Cào nội dung chi tiết và ảnh đại diện từ url bài viết, sau đó gửi lên AI để dịch/tóm tắt"""
     try:
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=ssl_context)) as session:
-            async with session.get(url, timeout=15) as resp:
-                if resp.status != 200:
-                    return {"content": "", "thumbnail": ""}
-                html = await resp.text()
-        soup = BeautifulSoup(html, "html.parser")
-        for sel in ["script", "style", "footer", ".ads", ".comments", ".related"]:
-            for tag in soup.select(sel):
-                tag.decompose()
-        root = None
-        for sel in ["main", "article", "#content", ".post", ".entry"]:
-            root = soup.select_one(sel)
-            if root:
-                break
-        if not root:
-            root = soup
-        title = soup.title.string.strip() if soup.title else ""
-        meta = ""
-        meta_tag = soup.find("meta", attrs={"name": "description"})
-        if meta_tag and meta_tag.get("content"):
-            meta = meta_tag["content"].strip()
-        paragraphs = [p.get_text(strip=True) for p in root.find_all("p")]
-        raw_content = f"{title}\n\n{meta}\n\n" + "\n".join(paragraphs)
-        raw_content = raw_content[:4000]
-        # Gọi AI để dịch/tóm tắt nội dung sang tiếng Việt dễ hiểu
-        ai_content = await call_openrouter_ai(raw_content, url)
-        ai_logger.info(f"AI summary for {url}: {ai_content[:200]}...")
-        # Ảnh đại diện: ưu tiên meta og:image, sau đó đến ảnh đầu tiên trong root, cuối cùng là ảnh đầu tiên toàn trang
-        thumbnail = ""
-        ogimg = soup.find("meta", property="og:image")
-        if ogimg and ogimg.get("content"):
-            thumbnail = ogimg["content"]
-            ai_logger.info(f"Thumbnail og:image for {url}: {thumbnail}")
-        else:
-            img_tag = root.find("img") if root else None
-            if img_tag and img_tag.get("src"):
-                thumbnail = img_tag["src"]
-                ai_logger.info(f"Thumbnail first img in root for {url}: {thumbnail}")
-            else:
-                img_tag2 = soup.find("img")
-                if img_tag2 and img_tag2.get("src"):
-                    thumbnail = img_tag2["src"]
-                    ai_logger.info(f"Thumbnail first img in page for {url}: {thumbnail}")
-        return {"content": ai_content, "thumbnail": thumbnail}
+        detail = await scrape_article_detail(url, session)
+        if detail is None:
+            return {"content": "", "thumbnail": ""}
+        return await summarize_article_detail(url, detail, session, ai_type=ai_type)
     except Exception as e:
         logger.warning(f"Lỗi cào chi tiết {url}: {e}")
         ai_logger.error(f"Lỗi cào chi tiết {url}: {e}")
         return {"content": "", "thumbnail": ""}
 
 
+# Circuit breaker: sau SOURCE_FAILURE_THRESHOLD lần lỗi liên tiếp thì tạm bỏ qua nguồn,
+# thời gian chờ tăng gấp đôi sau mỗi lần lỗi tiếp theo
+SOURCE_FAILURE_THRESHOLD = 3
+SOURCE_RETRY_BACKOFF = 300
+SOURCE_MAX_RETRY_BACKOFF = 24 * 3600
+
+
+def source_retry_at(fail_streak: int, now: datetime) -> Optional[datetime]:
+    """Thời điểm được thử lại nguồn đang lỗi, None nếu chưa tới ngưỡng"""
+    if fail_streak < SOURCE_FAILURE_THRESHOLD:
+        return None
+    backoff = SOURCE_RETRY_BACKOFF * 2 ** (fail_streak - SOURCE_FAILURE_THRESHOLD)
+    return now + timedelta(seconds=min(backoff, SOURCE_MAX_RETRY_BACKOFF))
+
+
+# Số bài viết mới tối đa được lưu cho mỗi nguồn trong một lần thu thập
+MAX_NEW_ARTICLES_PER_SOURCE = 5
+
+
+# Cache các url đã có trong DB để lượt sau khỏi phải hỏi lại DB
+SEEN_URL_CACHE_TIMEOUT = 30 * 24 * 3600
+
+
+def _seen_url_key(url: str) -> str:
+    return f"collector:seen_url:{hashlib.md5(url.encode('utf-8')).hexdigest()}"
+
+
+def filter_unseen_articles(articles_data: List[FetchedArticle]) -> List[FetchedArticle]:
+    """Bỏ các bài có url đã được đánh dấu trong cache (lỗi cache thì giữ nguyên danh sách)"""
+    if not articles_data:
+        return articles_data
+    try:
+        seen_keys = cache.get_many([_seen_url_key(a.url) for a in articles_data])
+    except Exception as e:
+        logger.warning(f"Seen-url cache unavailable: {e}")
+        return articles_data
+    return [a for a in articles_data if _seen_url_key(a.url) not in seen_keys]
+
+
+def mark_urls_seen(urls) -> None:
+    try:
+        cache.set_many({_seen_url_key(url): 1 for url in urls}, SEEN_URL_CACHE_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"Seen-url cache unavailable: {e}")
+
+
+def feed_full_content(html: str) -> str:
+    """Text của nội dung đầy đủ lấy từ feed, rỗng nếu quá ngắn để thay cho trang chi tiết"""
+    if len(html) < FEED_FULL_CONTENT_MIN_LENGTH:
+        return ''
+    text = html_to_text(html)
+    return text if len(text) >= FEED_FULL_CONTENT_MIN_LENGTH else ''
+
+
+def save_new_articles_sync(source: Source, articles_data: List[FetchedArticle]) -> int:
+    """Lưu các bài chưa có trong DB bằng một transaction, trả về số bài mới"""
+    articles_data = filter_unseen_articles(articles_data)
+    if not articles_data:
+        return 0
+
+    with sqlite_write_lock(), transaction.atomic():
+        # Lọc lấy tối đa MAX_NEW_ARTICLES_PER_SOURCE bài viết mới (chưa có trong Article)
+        # Tra theo url_hash (unique index 32 byte); order_by() bỏ ORDER BY mặc định (-published_at)
+        hashes = {a.url: article_url_hash(a.url) for a in articles_data}
+        existing_hashes = set(
+            bytes(h) for h in Article.objects.filter(url_hash__in=set(hashes.values()))
+            .order_by()
+            .values_list('url_hash', flat=True)
+        )
+        existing_urls = {url for url, h in hashes.items() if h in existing_hashes}
+        new_articles = [a for a in articles_data if a.url not in existing_urls]
+        if len(new_articles) > MAX_NEW_ARTICLES_PER_SOURCE:
+            new_articles = new_articles[:MAX_NEW_ARTICLES_PER_SOURCE]
+            # Còn bài mới bị cắt: bỏ ETag/Last-Modified để lần sau tải lại feed,
+            # nếu không server trả 304 và các bài còn lại bị bỏ sót
+            source.etag = ''
+            source.last_modified = ''
+
+        # Lưu tất cả bài mới trong một lần INSERT; url_hash là unique nên
+        # ignore_conflicts bỏ qua các bài đã được lưu bởi tiến trình khác
+        article_objs = [
+            Article(
+                url=data.url,
+                url_hash=hashes[data.url],
+                title=data.title,
+                source=source,
+                published_at=data.published_at,
+                summary=data.summary,
+                # Feed đã có nội dung đầy đủ thì lưu luôn, không thì để rỗng chờ cào chi tiết
+                content=feed_full_content(data.content),
+                thumbnail='',
+                is_ai_processed=False,
+                ai_type='',
+                ai_content='',
+            )
+            for data in new_articles
+        ]
+        if article_objs:
+            Article.objects.bulk_create(article_objs, ignore_conflicts=True, batch_size=500)
+
+    # Chỉ đánh dấu sau khi transaction đã commit
+    mark_urls_seen(existing_urls.union(obj.url for obj in article_objs))
+    return len(article_objs)
+
+
+# Chạy trên thread pool để các nguồn ghi bài song song thay vì xếp hàng qua một thread
+save_new_articles = run_in_db_thread(save_new_articles_sync)
+
+
+def save_collect_results_sync(results: List[Dict[str, Any]]):
+    """Ghi FetchLog, Source.last_fetched và trạng thái circuit breaker của một lượt thu thập trong một transaction"""
+    with transaction.atomic():
+        FetchLog.objects.bulk_create([FetchLog(**log_data) for log_data in results])
+        fetched_sources = [log_data['source'] for log_data in results if log_data['status'] == 'success']
+        failed_sources = [log_data['source'] for log_data in results if log_data['status'] != 'success']
+        if fetched_sources:
+            Source.objects.bulk_update(
+                fetched_sources, ['last_fetched', 'etag', 'last_modified', 'fail_streak', 'next_retry_at']
+            )
+        if failed_sources:
+            Source.objects.bulk_update(failed_sources, ['fail_streak', 'next_retry_at'])
+
+
+save_collect_results = sync_to_async(save_collect_results_sync, thread_sensitive=True)
+
+
+def fetch_cutoff(now: datetime) -> models.Expression:
+    """now - fetch_interval (giây) của từng nguồn, dạng biểu thức SQL.
+
+    Phải khai báo rõ kiểu DateTime/Duration: nếu không, SQLite coi now là chuỗi và phép trừ
+    thành phép trừ số, so sánh với last_fetched luôn sai.
+    """
+    interval = models.ExpressionWrapper(
+        models.F('fetch_interval') * timedelta(seconds=1), output_field=models.DurationField()
+    )
+    return models.ExpressionWrapper(
+        models.Value(now, output_field=models.DateTimeField()) - interval,
+        output_field=models.DateTimeField(),
+    )
+
+
+def due_sources(now: datetime, team_code: Optional[str] = None, force: bool = False) -> models.QuerySet:
+    """Các nguồn đang active cần thu thập; force=True bỏ qua fetch_interval và circuit breaker"""
+    queryset = Source.objects.filter(is_active=True)
+
+    if team_code:
+        queryset = queryset.filter(team__code=team_code)
+    if force:
+        return queryset
+
+    # Lọc các nguồn có force_collect=True hoặc đã đến thời gian thu thập
+    queryset = queryset.filter(
+        models.Q(force_collect=True) |
+        models.Q(last_fetched__isnull=True) |
+        models.Q(last_fetched__lte=fetch_cutoff(now))
+    )
+    # Bỏ qua các nguồn đang bị circuit breaker tạm ngắt
+    return queryset.filter(models.Q(next_retry_at__isnull=True) | models.Q(next_retry_at__lte=now))
+
+
 class DataCollector:
     """Main collector class to orchestrate fetching"""
 
+    def __init__(self):
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._owns_session = False
+
+    async def __aenter__(self) -> 'DataCollector':
+        """Mở một session dùng chung cho mọi lần thu thập trong khối `async with`"""
+        if self.session is None:
+            self.session = create_client_session()
+            self._owns_session = True
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if self._owns_session:
+            await self.session.close()
+            self.session = None
+            self._owns_session = False
+
+    @asynccontextmanager
+    async def _session_scope(self):
+        """Dùng lại session đang mở, nếu chưa có thì mở một session cho lần thu thập này.
+
+        Session tạm chỉ được yield ra (truyền xuống _collect), không gán vào self.session, để các
+        lần thu thập chạy đồng thời trên cùng collector không đóng session của nhau.
+        """
+        if self.session is not None:
+            yield self.session
+            return
+        async with create_client_session() as session:
+            yield session
+
     async def collect_from_source(self, source: Source) -> Dict[str, Any]:
+        async with self._session_scope() as session:
+            log_data = await self._collect(source, session)
+        await save_collect_results([log_data])
+        return log_data
+
+    async def _collect(self, source: Source, session: aiohttp.ClientSession) -> Dict[str, Any]:
+        """Thu thập một nguồn; FetchLog và last_fetched do save_collect_results ghi"""
         start_time = time.time()
         log_data = {
             'source': source,
@@ -417,39 +1235,20 @@ class DataCollector:
         }
 
         try:
-            fetcher = FetcherFactory.create_fetcher(source)
-            articles_data = await fetcher.fetch()
+            fetcher = FetcherFactory.create_fetcher(source, session)
+            try:
+                articles_data = await asyncio.wait_for(fetcher.fetch(), SOURCE_FETCH_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Fetch quá {SOURCE_FETCH_TIMEOUT}s") from None
+            # Bỏ các bài trùng url trong cùng một lần fetch (và bài không có url)
+            articles_data = list({a.url: a for a in articles_data if a.url}.values())
 
-            # Lọc lấy tối đa 5 bài viết mới (chưa có trong Article)
-            existing_urls = set(await sync_to_async(list)(Article.objects.filter(url__in=[a['url'] for a in articles_data]).values_list('url', flat=True)))
-            new_articles = [a for a in articles_data if a['url'] not in existing_urls][:5]
+            saved_count = await save_new_articles(source, articles_data)
 
-            saved_count = 0
-            for data in new_articles:
-                try:
-                    article_obj, created = await create_article(
-                        url=data['url'],
-                        defaults={
-                            'title': data['title'],
-                            'source': source,
-                            'published_at': data['published_at'],
-                            'summary': data.get('summary', ''),
-                            'content': '',  # Chưa cào chi tiết, để rỗng hoặc cào thô nếu muốn
-                            'thumbnail': '',
-                            'is_ai_processed': False,
-                            'ai_type': '',
-                            'ai_content': '',
-                        }
-                    )
-                    saved_count += 1
-                    await asyncio.sleep(2)
-                except Exception as e:
-                    logger.error(f"Error saving article {data.get('url')}: {e}")
-                    continue
-
-            # Update source.last_fetched
+            # Update source.last_fetched (được lưu cùng FetchLog)
             source.last_fetched = django_timezone.now()
-            await update_source_last_fetched(source, update_fields=['last_fetched'])
+            source.fail_streak = 0
+            source.next_retry_at = None
 
             log_data.update({
                 'status': 'success',
@@ -462,33 +1261,32 @@ class DataCollector:
                 'status': 'error'
             })
             logger.error(f"Collection failed for {source.source}: {e}")
+            source.fail_streak += 1
+            source.next_retry_at = source_retry_at(source.fail_streak, django_timezone.now())
 
         finally:
             log_data['execution_time'] = time.time() - start_time
-            # Create fetch log
-            await create_fetch_log(**log_data)
 
         return log_data
 
-    async def collect_all_active_sources(self, team_code: Optional[str] = None):
-        now = django_timezone.now()
-        queryset = Source.objects.filter(is_active=True)
-
-        if team_code:
-            queryset = queryset.filter(team__code=team_code)
-
-        # Lọc các nguồn có force_collect=True hoặc đã đến thời gian thu thập
-        queryset = queryset.filter(
-            models.Q(force_collect=True) |
-            models.Q(last_fetched__isnull=True) |
-            models.Q(last_fetched__lte=now - models.F('fetch_interval') * timedelta(seconds=1))
-        )
-
-        active_sources = await sync_to_async(list)(queryset)
+    async def collect_all_active_sources(self, team_code: Optional[str] = None, force: bool = False):
+        queryset = due_sources(django_timezone.now(), team_code=team_code, force=force)
+        active_sources = [src async for src in queryset.aiterator(chunk_size=200)]
 
         if active_sources:
-            tasks = [self.collect_from_source(src) for src in active_sources]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            # Giới hạn số nguồn thu thập đồng thời để tránh dồn DNS/socket/upstream
+            semaphore = asyncio.Semaphore(getattr(settings, 'COLLECTOR_MAX_CONCURRENCY', 20))
+
+            # Một session (connection pool) dùng chung cho tất cả nguồn
+            async with self._session_scope() as session:
+                async def collect_guarded(src):
+                    async with semaphore:
+                        return await self._collect(src, session)
+
+                tasks = [collect_guarded(src) for src in active_sources]
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+            # Ghi FetchLog và last_fetched của cả lượt trong một lần
+            await save_collect_results([r for r in results if isinstance(r, dict)])
             success_count = sum(1 for r in results if isinstance(r, dict) and r.get('status') == 'success')
             total_articles = sum(r.get('articles_count', 0) for r in results if isinstance(r, dict))
             logger.info(f"Collection completed: {success_count}/{len(tasks)} sources successful, {total_articles} new articles")
@@ -496,18 +1294,20 @@ class DataCollector:
         return []
 
 
-async def notify_teams(webhook_url: str, title: str, content: str, url: str = None):
+async def notify_teams(webhook_url: str, title: str, content: str, url: str = None,
+                       session: Optional[aiohttp.ClientSession] = None):
     """Gửi thông báo đến Microsoft Teams thông qua webhook"""
-    logger.info(f"[Teams] Preparing to send notification...")
-    logger.info(f"[Teams] Webhook URL: {webhook_url[:30]}...")
-    logger.info(f"[Teams] Title: {title}")
-    logger.info(f"[Teams] URL: {url}")
-    logger.info(f"[Teams] Content length: {len(content)} characters")
-
     if not webhook_url:
         logger.warning("[Teams] No webhook URL provided, skipping notification")
         return
 
+    logger.info(f"[Teams] Sending notification for {url}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            f"[Teams] Webhook URL: {webhook_url[:30]}..., title: {title}, "
+            f"content length: {len(content)} characters"
+        )
+
     try:
         card = {
             "@type": "MessageCard",
@@ -521,13 +1321,12 @@ async def notify_teams(webhook_url: str, title: str, content: str, url: str = No
             }]
         }
 
-        logger.info("[Teams] Sending request to Teams webhook...")
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=ssl_context)) as session:
-            async with session.post(webhook_url, json=card) as resp:
+        async with use_client_session(session) as http:
+            async with http.post(webhook_url, json=card) as resp:
                 response_text = await resp.text()
                 if resp.status == 200:
-                    logger.info("[Teams] Successfully sent notification to Teams")
-                    logger.debug(f"[Teams] Response: {response_text}")
+                    logger.info(f"[Teams] Successfully sent notification for {url}")
+                    logger.debug("[Teams] Response: %.500s", response_text)
                 else:
                     logger.error(f"[Teams] Error sending notification. Status: {resp.status}")
                     logger.error(f"[Teams] Error response: {response_text}")
@@ -1,6 +1,5 @@
 import asyncio
 from django.core.management.base import BaseCommand
-from django.utils import timezone
 from collector.fetchers import DataCollector
 from collector.models import Source
 
@@ -35,28 +34,13 @@ class Command(BaseCommand):
                     self.style.ERROR(f'Source with ID {options["source_id"]} not found or inactive')
                 )
         else:
-            # Collect from all sources hoặc chỉ những nguồn đến hạn thu thập
-            if not options['force']:
-                # Lọc các nguồn đến hạn thu thập bằng Python (tương thích SQLite)
-                now = timezone.now()
-                sources = Source.objects.filter(is_active=True)
-                # Nếu force_collect=True thì luôn thu thập, còn lại kiểm tra thời gian chờ
-                due_sources = [
-                    s for s in sources
-                    if s.force_collect or s.last_fetched is None or (now - s.last_fetched).total_seconds() >= s.fetch_interval
-                ]
-                if not due_sources:
-                    self.stdout.write(self.style.SUCCESS('No sources due for update'))
-                    return
-                # Giới hạn số lượng nguồn xử lý đồng thời để tránh quá tải
-                MAX_SOURCES = 10
-                limited_sources = due_sources[:MAX_SOURCES]
-                async def collect_all(due_sources, collector):
-                    return await asyncio.gather(*(collector.collect_from_source(s) for s in due_sources))
-                results = asyncio.run(collect_all(limited_sources, collector))
-            else:
-                results = asyncio.run(collector.collect_all_active_sources())
-            
+            # Collect from all sources hoặc chỉ những nguồn đến hạn thu thập (lọc bằng SQL,
+            # số nguồn chạy đồng thời giới hạn bởi COLLECTOR_MAX_CONCURRENCY)
+            results = asyncio.run(collector.collect_all_active_sources(force=options['force']))
+            if not results:
+                self.stdout.write(self.style.SUCCESS('No sources due for update'))
+                return
+
             self.stdout.write('\n--- Collection Summary ---')
             for i, result in enumerate(results):
                 if isinstance(result, dict):
@@ -1,6 +1,28 @@
-import json
+import os
+from itertools import islice
+
+import ijson
+import orjson
+from django.core.exceptions import ValidationError
 from django.core.management.base import BaseCommand
-from collector.models import Source
+from django.db import transaction
+from collector.models import Source, Team
+
+# Các trường của Source được nhận từ file JSON (team được map riêng từ code)
+IMPORT_FIELDS = ('url', 'type', 'params', 'is_active', 'fetch_interval', 'force_collect')
+# Số nguồn xử lý trong mỗi lần SELECT/INSERT/UPDATE
+BATCH_SIZE = 1000
+# File nhỏ hơn mức này được decode một lần bằng orjson (nhanh hơn), file lớn hơn đọc theo luồng bằng ijson
+STREAM_MIN_BYTES = 8 * 1024 * 1024
+
+
+def iter_sources(f):
+    """Duyệt các phần tử của mảng JSON trong file (mở ở chế độ nhị phân)"""
+    if os.fstat(f.fileno()).st_size < STREAM_MIN_BYTES:
+        return iter(orjson.loads(f.read()))
+    # ijson tự chọn backend C nếu có; use_float để params không chứa Decimal (JSONField không serialize được)
+    return ijson.items(f, 'item', use_float=True)
+
 
 class Command(BaseCommand):
     help = 'Import sources from JSON file'
@@ -20,36 +42,19 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         json_file = options['json_file']
         update_existing = options['update']
-        
+
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                sources_data = json.load(f)
-            
             created_count = 0
             updated_count = 0
-            
-            for source_data in sources_data:
-                if update_existing:
-                    source, created = Source.objects.update_or_create(
-                        source=source_data['source'],
-                        defaults=source_data
-                    )
-                    if created:
-                        created_count += 1
-                    else:
-                        updated_count += 1
-                else:
-                    source, created = Source.objects.get_or_create(
-                        source=source_data['source'],
-                        defaults=source_data
-                    )
-                    if created:
-                        created_count += 1
-                    else:
-                        self.stdout.write(
-                            self.style.WARNING(f'Source "{source_data["source"]}" already exists, skipping...')
-                        )
-            
+
+            # Xử lý theo lô, file lớn chỉ giữ một lô trong bộ nhớ
+            with open(json_file, 'rb') as f, transaction.atomic():
+                sources_data = iter_sources(f)
+                while batch := list(islice(sources_data, BATCH_SIZE)):
+                    created, updated = self.import_batch(batch, update_existing)
+                    created_count += created
+                    updated_count += updated
+
             if update_existing and updated_count > 0:
                 self.stdout.write(
                     self.style.SUCCESS(f'Successfully imported {created_count} new sources and updated {updated_count} existing sources')
@@ -58,16 +63,70 @@ class Command(BaseCommand):
                 self.stdout.write(
                     self.style.SUCCESS(f'Successfully imported {created_count} sources')
                 )
-                
+
         except FileNotFoundError:
             self.stdout.write(
                 self.style.ERROR(f'File {json_file} not found')
             )
-        except json.JSONDecodeError as e:
+        except (orjson.JSONDecodeError, ijson.JSONError) as e:
             self.stdout.write(
                 self.style.ERROR(f'Invalid JSON format: {e}')
             )
         except Exception as e:
             self.stdout.write(
                 self.style.ERROR(f'Error importing sources: {e}')
-            )
\ No newline at end of file
+            )
+
+    def import_batch(self, batch, update_existing):
+        """Tạo/cập nhật một lô nguồn bằng một SELECT và bulk_create (upsert nếu --update); trả về (created, updated)"""
+        teams = Team.objects.in_bulk({data.get('team') for data in batch}, field_name='code')
+
+        # Gom theo tên nguồn (bản ghi sau ghi đè bản ghi trước nếu trùng tên trong file)
+        records = {}
+        for data in batch:
+            team = teams.get(data.get('team'))
+            if team is None:
+                self.stdout.write(
+                    self.style.WARNING(f'Team "{data.get("team")}" of source "{data["source"]}" not found, skipping...')
+                )
+                continue
+            values = {field: data[field] for field in IMPORT_FIELDS if field in data}
+            values['team'] = team
+            # Chỉ kiểm tra params (như Source.clean), không full_clean từng nguồn vì sẽ thêm query kiểm tra unique
+            try:
+                params = Source.validate_params(values.get('type'), values.get('params'))
+            except ValidationError as e:
+                self.stdout.write(
+                    self.style.WARNING(f'Invalid params of source "{data["source"]}": {e}, skipping...')
+                )
+                continue
+            if params is not None:
+                values['params'] = params
+            records[data['source']] = values
+
+        existing = set(Source.objects.filter(source__in=list(records)).values_list('source', flat=True))
+
+        if not update_existing:
+            for name in existing:
+                self.stdout.write(
+                    self.style.WARNING(f'Source "{name}" already exists, skipping...')
+                )
+            new_sources = [Source(source=name, **values) for name, values in records.items() if name not in existing]
+            # ignore_conflicts phòng trường hợp nguồn được tạo đồng thời sau lúc SELECT
+            Source.objects.bulk_create(new_sources, ignore_conflicts=True, batch_size=BATCH_SIZE)
+            return len(new_sources), 0
+
+        # Upsert theo source (INSERT ... ON CONFLICT DO UPDATE). Gom theo tập trường có trong bản ghi
+        # để trường bị bỏ trống trong file giữ nguyên giá trị cũ thay vì bị ghi đè bằng default
+        groups = {}
+        for name, values in records.items():
+            groups.setdefault(tuple(sorted(values)), []).append(Source(source=name, **values))
+        for fields, sources in groups.items():
+            Source.objects.bulk_create(
+                sources,
+                update_conflicts=True,
+                unique_fields=['source'],
+                update_fields=[*fields, 'updated_at'],
+                batch_size=BATCH_SIZE,
+            )
+        return len(records) - len(existing), len(existing)
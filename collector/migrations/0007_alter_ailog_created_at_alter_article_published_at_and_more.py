@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-16 00:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collector', '0006_alter_systemconfig_key'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ailog',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='article',
+            name='published_at',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='fetchlog',
+            name='fetched_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
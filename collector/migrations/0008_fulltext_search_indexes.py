@@ -0,0 +1,42 @@
+# Generated by Django 5.2.1 on 2026-10-16 01:05
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+# Phải trùng với search_vector_fields / search_config trong admin để PostgreSQL dùng được index
+# (index của ailog được tạo lại không có url ở migration 0015)
+SEARCH_INDEXES = {
+    'article': ('article_search_gin', ('title', 'content', 'summary', 'ai_content')),
+    'ailog': ('ailog_search_gin', ('url', 'prompt', 'result', 'error_message')),
+}
+
+
+def _search_index(name, fields):
+    return GinIndex(SearchVector(*fields, config='simple'), name=name)
+
+
+def create_search_indexes(apps, schema_editor):
+    # GIN/tsvector chỉ có trên PostgreSQL, SQLite (dev) vẫn dùng icontains
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name, (name, fields) in SEARCH_INDEXES.items():
+        schema_editor.add_index(apps.get_model('collector', model_name), _search_index(name, fields))
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name, (name, fields) in SEARCH_INDEXES.items():
+        schema_editor.remove_index(apps.get_model('collector', model_name), _search_index(name, fields))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collector', '0007_alter_ailog_created_at_alter_article_published_at_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-16 00:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collector', '0008_fulltext_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='source',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['last_fetched'], name='src_active_lastfetched_idx'),
+        ),
+    ]
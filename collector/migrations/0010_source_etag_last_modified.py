@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-16 01:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collector', '0009_source_src_active_lastfetched_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='source',
+            name='etag',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='source',
+            name='last_modified',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-16 01:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collector', '0010_source_etag_last_modified'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='source',
+            name='fail_streak',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='source',
+            name='next_retry_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
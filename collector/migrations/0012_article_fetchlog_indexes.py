@@ -0,0 +1,25 @@
+# Generated by Django 5.2.1 on 2026-10-16 01:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collector', '0011_source_circuit_breaker'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['source', '-published_at'], name='article_source_pub_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('is_ai_processed', False)), fields=['published_at'], name='article_unprocessed_pub_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fetchlog',
+            index=models.Index(fields=['source', '-fetched_at'], name='fetchlog_source_fetched_idx'),
+        ),
+    ]
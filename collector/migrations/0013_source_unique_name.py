@@ -0,0 +1,59 @@
+# Generated by Django 5.2.1 on 2026-10-16 01:22
+
+from django.db import migrations, models
+
+SOURCE_NAME_MAX_LENGTH = 100
+
+
+def dedupe_source_names(apps, schema_editor):
+    """Xử lý các nguồn trùng tên trước khi thêm unique: giữ nguồn cũ nhất.
+
+    Bản trùng cùng url và type là cùng một nguồn: chuyển Article/FetchLog sang nguồn giữ lại rồi xoá.
+    Bản trùng khác url/type là nguồn khác: đổi tên thành "<tên> #<id>" để không mất cấu hình.
+    """
+    Source = apps.get_model('collector', 'Source')
+    Article = apps.get_model('collector', 'Article')
+    FetchLog = apps.get_model('collector', 'FetchLog')
+
+    names = set(Source.objects.values_list('source', flat=True))
+    duplicated = (
+        Source.objects.values('source')
+        .annotate(count=models.Count('id'))
+        .filter(count__gt=1)
+        .values_list('source', flat=True)
+    )
+    for name in list(duplicated):
+        keeper, *others = Source.objects.filter(source=name).order_by('id')
+        for source in others:
+            if source.url == keeper.url and source.type == keeper.type:
+                Article.objects.filter(source=source).update(source=keeper)
+                FetchLog.objects.filter(source=source).update(source=keeper)
+                source.delete()
+                continue
+            suffix = f' #{source.pk}'
+            new_name = name[:SOURCE_NAME_MAX_LENGTH - len(suffix)] + suffix
+            while new_name in names:
+                suffix += "'"
+                new_name = name[:SOURCE_NAME_MAX_LENGTH - len(suffix)] + suffix
+            names.add(new_name)
+            source.source = new_name
+            source.save(update_fields=['source'])
+
+
+class Migration(migrations.Migration):
+    # Chạy phần dữ liệu trong transaction riêng: trên PostgreSQL, ALTER TABLE cùng transaction
+    # với các UPDATE/DELETE có FK deferred sẽ lỗi "pending trigger events"
+    atomic = False
+
+    dependencies = [
+        ('collector', '0012_article_fetchlog_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_source_names, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='source',
+            name='source',
+            field=models.CharField(max_length=100, unique=True),
+        ),
+    ]
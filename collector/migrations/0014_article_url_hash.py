@@ -0,0 +1,47 @@
+# Generated by Django 5.2.1 on 2026-10-16 02:10
+
+import hashlib
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def fill_url_hash(apps, schema_editor):
+    # Không dùng article_url_hash của models vì migration phải cố định theo thời điểm viết
+    Article = apps.get_model('collector', 'Article')
+    batch = []
+    for article in Article.objects.only('id', 'url').order_by().iterator(chunk_size=BATCH_SIZE):
+        article.url_hash = hashlib.sha256(article.url.encode('utf-8')).digest()
+        batch.append(article)
+        if len(batch) >= BATCH_SIZE:
+            Article.objects.bulk_update(batch, ['url_hash'])
+            batch = []
+    if batch:
+        Article.objects.bulk_update(batch, ['url_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collector', '0013_source_unique_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='url_hash',
+            field=models.BinaryField(editable=False, max_length=32, null=True),
+        ),
+        migrations.RunPython(fill_url_hash, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='article',
+            name='url_hash',
+            field=models.BinaryField(editable=False, max_length=32, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='article',
+            name='url',
+            field=models.URLField(db_index=True),
+        ),
+    ]
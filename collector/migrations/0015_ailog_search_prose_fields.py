@@ -0,0 +1,37 @@
+# Generated by Django 5.2.1 on 2026-10-16 03:10
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+INDEX_NAME = 'ailog_search_gin'
+# url không đưa vào tsvector (bị tách thành các token vô nghĩa), admin tìm url bằng icontains
+OLD_FIELDS = ('url', 'prompt', 'result', 'error_message')
+NEW_FIELDS = ('prompt', 'result', 'error_message')
+
+
+def _replace_index(apps, schema_editor, old_fields, new_fields):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    AILog = apps.get_model('collector', 'AILog')
+    schema_editor.remove_index(AILog, GinIndex(SearchVector(*old_fields, config='simple'), name=INDEX_NAME))
+    schema_editor.add_index(AILog, GinIndex(SearchVector(*new_fields, config='simple'), name=INDEX_NAME))
+
+
+def use_prose_fields(apps, schema_editor):
+    _replace_index(apps, schema_editor, OLD_FIELDS, NEW_FIELDS)
+
+
+def restore_url_field(apps, schema_editor):
+    _replace_index(apps, schema_editor, NEW_FIELDS, OLD_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collector', '0014_article_url_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(use_prose_fields, restore_url_field),
+    ]
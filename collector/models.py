@@ -1,5 +1,6 @@
 from django.db import models
 from django.core.exceptions import ValidationError
+import hashlib
 import json
 from django.utils import timezone
 
@@ -27,9 +28,12 @@ class Source(models.Model):
         ('rss', 'RSS Feed'),
         ('static', 'Web Tĩnh (AgentQL)'),
     ]
+    # Tra nhãn trực tiếp trong __str__, tránh get_FOO_display() dựng lại flatchoices mỗi lần gọi
+    TYPE_DISPLAY = dict(TYPE_CHOICES)
 
     url = models.URLField()
-    source = models.CharField(max_length=100)
+    # Tên nguồn là khoá tự nhiên khi import (upsert ON CONFLICT theo source)
+    source = models.CharField(max_length=100, unique=True)
     type = models.CharField(max_length=10, choices=TYPE_CHOICES)
     team = models.ForeignKey(Team, on_delete=models.PROTECT, related_name='sources')
     params = models.JSONField(blank=True, null=True)
@@ -41,45 +45,70 @@ class Source(models.Model):
     fetch_interval = models.IntegerField(default=3600, help_text="Interval in seconds")
     last_fetched = models.DateTimeField(null=True, blank=True)
     force_collect = models.BooleanField(default=False, help_text="Bật để luôn thu thập nguồn này, bỏ qua thời gian chờ")
+    # Validator của lần tải trước, dùng cho conditional GET (304 Not Modified)
+    etag = models.CharField(max_length=255, blank=True, default='')
+    last_modified = models.CharField(max_length=64, blank=True, default='')
+    # Circuit breaker: số lần lỗi liên tiếp và thời điểm được thử lại
+    fail_streak = models.PositiveIntegerField(default=0)
+    next_retry_at = models.DateTimeField(null=True, blank=True)
     
-    def clean(self):
-        super().clean()
-        
+    DEFAULT_STATIC_PROMPT = "hãy lấy các url liên quan đến [nội dung bạn cần lấy] sau đó gửi lại cho tôi , yêu cầu dữ liệu trả về chỉ là 1 mảng các url, không được sai format như tôi yêu cầu"
+
+    @classmethod
+    def validate_params(cls, type, params):
+        """Bổ sung params mặc định và kiểm tra cấu trúc theo type; trả về params đã chuẩn hoá.
+
+        Dùng chung cho clean() (form/admin) và import hàng loạt (không gọi full_clean cho từng nguồn).
+        """
         # Set default params for static type
-        if self.type == 'static':
-            if not self.params:
-                self.params = {
-                    "prompt": "hãy lấy các url liên quan đến [nội dung bạn cần lấy] sau đó gửi lại cho tôi , yêu cầu dữ liệu trả về chỉ là 1 mảng các url, không được sai format như tôi yêu cầu"
-                }
-            elif 'prompt' not in self.params:
-                self.params['prompt'] = "hãy lấy các url liên quan đến [nội dung bạn cần lấy] sau đó gửi lại cho tôi , yêu cầu dữ liệu trả về chỉ là 1 mảng các url, không được sai format như tôi yêu cầu"
-        
+        if type == 'static':
+            if not params:
+                params = {"prompt": cls.DEFAULT_STATIC_PROMPT}
+            elif 'prompt' not in params:
+                params['prompt'] = cls.DEFAULT_STATIC_PROMPT
+
         # Validate params structure
-        if self.params:
+        if params:
             try:
-                if self.type == 'api' and 'headers' in self.params:
-                    if not isinstance(self.params['headers'], dict):
+                if type == 'api' and 'headers' in params:
+                    if not isinstance(params['headers'], dict):
                         raise ValidationError({'params': 'API headers must be a dictionary'})
-                elif self.type == 'static' and 'prompt' not in self.params:
+                elif type == 'static' and 'prompt' not in params:
                     raise ValidationError({'params': 'Static sources must have a prompt parameter'})
             except (TypeError, KeyError) as e:
                 raise ValidationError({'params': f'Invalid params structure: {e}'})
+        return params
+
+    def clean(self):
+        super().clean()
+        self.params = self.validate_params(self.type, self.params)
 
     def __str__(self):
-        return f"{self.source} ({self.get_type_display()})"
+        return f"{self.source} ({self.TYPE_DISPLAY.get(self.type, self.type)})"
 
     class Meta:
         verbose_name = "Data Source"
         verbose_name_plural = "Data Sources"
         ordering = ['source']
         app_label = 'collector'
+        indexes = [
+            # Partial index cho truy vấn "nguồn đang bật đến hạn thu thập" của scheduler
+            models.Index(fields=['last_fetched'], condition=models.Q(is_active=True), name='src_active_lastfetched_idx'),
+        ]
+
+def article_url_hash(url):
+    """SHA-256 (32 byte) của URL, dùng làm khoá chống trùng bài viết"""
+    return hashlib.sha256(url.encode('utf-8')).digest()
 
 class Article(models.Model):
     """Model để lưu trữ các bài viết đã thu thập"""
     title = models.CharField(max_length=500)
-    url = models.URLField(unique=True)
+    # Index thường cho các tra cứu theo url (AILog -> Article); chống trùng dựa trên url_hash
+    url = models.URLField(db_index=True)
+    # Unique index trên khoá 32 byte cố định thay vì chuỗi URL dài, so sánh nhanh hơn khi INSERT
+    url_hash = models.BinaryField(max_length=32, unique=True, editable=False)
     source = models.ForeignKey(Source, on_delete=models.CASCADE, related_name='articles')
-    published_at = models.DateTimeField()
+    published_at = models.DateTimeField(db_index=True)
     created_at = models.DateTimeField(default=timezone.now)
     summary = models.TextField(blank=True)
     content = models.TextField(blank=True)
@@ -103,10 +132,36 @@ class Article(models.Model):
         verbose_name_plural = "Articles"
         ordering = ['-published_at']
         app_label = 'collector'
+        indexes = [
+            # Danh sách bài theo nguồn, mới nhất trước (API articles, admin lọc theo nguồn)
+            models.Index(fields=['source', '-published_at'], name='article_source_pub_idx'),
+            # Job OpenRouter lấy bài chưa xử lý cũ nhất
+            models.Index(fields=['published_at'], condition=models.Q(is_ai_processed=False), name='article_unprocessed_pub_idx'),
+        ]
     
+    def validate_unique(self, exclude=None):
+        super().validate_unique(exclude)
+        # url_hash không editable nên ModelForm không tự kiểm tra trùng; báo lỗi form thay vì IntegrityError
+        if self.url and (exclude is None or 'url' not in exclude):
+            duplicates = Article.objects.filter(url_hash=article_url_hash(self.url))
+            if self.pk is not None:
+                duplicates = duplicates.exclude(pk=self.pk)
+            if duplicates.exists():
+                raise ValidationError({'url': self.unique_error_message(Article, ('url',))})
+
+    def save(self, *args, **kwargs):
+        # bulk_create không gọi save(), nơi tạo hàng loạt phải tự gán url_hash
+        self.url_hash = article_url_hash(self.url)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.title
 
+class FetchLogManager(models.Manager):
+    """Luôn join sẵn source vì __str__ và các màn hình log đều dùng source.source"""
+    def get_queryset(self):
+        return super().get_queryset().select_related('source')
+
 class FetchLog(models.Model):
     """Log việc thu thập dữ liệu"""
     STATUS_CHOICES = [
@@ -114,13 +169,16 @@ class FetchLog(models.Model):
         ('error', 'Lỗi'),
         ('partial', 'Một phần'),
     ]
+    STATUS_DISPLAY = dict(STATUS_CHOICES)
     
     source = models.ForeignKey(Source, on_delete=models.CASCADE, related_name='fetch_logs')
     status = models.CharField(max_length=10, choices=STATUS_CHOICES)
     articles_count = models.IntegerField(default=0)
     error_message = models.TextField(blank=True)
     execution_time = models.FloatField(help_text="Time in seconds")
-    fetched_at = models.DateTimeField(auto_now_add=True)
+    fetched_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    objects = FetchLogManager()
     
     @property
     def team(self):
@@ -136,9 +194,13 @@ class FetchLog(models.Model):
         verbose_name = "Fetch Log"
         verbose_name_plural = "Fetch Logs"
         ordering = ['-fetched_at']
+        indexes = [
+            # Log gần nhất của từng nguồn (source.fetch_logs.first())
+            models.Index(fields=['source', '-fetched_at'], name='fetchlog_source_fetched_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.source.source} - {self.get_status_display()} ({self.fetched_at})"
+        return f"{self.source.source} - {self.STATUS_DISPLAY.get(self.status, self.status)} ({self.fetched_at})"
 
 class AILog(models.Model):
     """Log tương tác với OpenRouter AI"""
@@ -148,7 +210,7 @@ class AILog(models.Model):
     result = models.TextField(blank=True)
     status = models.CharField(max_length=20, choices=[('success', 'Thành công'), ('error', 'Lỗi')], default='success')
     error_message = models.TextField(blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     
     @property
     def team(self):
@@ -181,6 +243,7 @@ class JobConfig(models.Model):
         ('crawl', 'Cào dữ liệu'),
         ('openrouter', 'Gửi OpenRouter'),
     ]
+    JOB_TYPE_DISPLAY = dict(JOB_TYPE_CHOICES)
     job_type = models.CharField(max_length=50, choices=JOB_TYPE_CHOICES, unique=True)
     enabled = models.BooleanField(default=True)
     limit = models.IntegerField(default=10)
@@ -188,7 +251,7 @@ class JobConfig(models.Model):
     last_type_sent = models.CharField(max_length=20, blank=True, default='')
 
     def __str__(self):
-        return f"{self.get_job_type_display()} (limit: {self.limit})"
+        return f"{self.JOB_TYPE_DISPLAY.get(self.job_type, self.job_type)} (limit: {self.limit})"
 
     class Meta:
         verbose_name = "Job Config"
@@ -203,6 +266,7 @@ class SystemConfig(models.Model):
         ('teams_webhook', 'Teams Webhook URL'),
         ('agentql_api_key', 'AgentQL API Key')
     ]
+    KEY_DISPLAY = dict(KEY_CHOICES)
 
     KEY_TYPES = [
         ('api_key', 'API Key'),
@@ -231,10 +295,14 @@ class SystemConfig(models.Model):
             if not self.team:
                 raise ValidationError({'team': 'Team is required for Teams Webhook'})
 
+    @property
+    def key_display(self):
+        return self.KEY_DISPLAY.get(self.key, self.key)
+
     def __str__(self):
         if self.team:
-            return f"{self.get_key_display()} ({self.team.name})"
-        return self.get_key_display()
+            return f"{self.key_display} ({self.team.name})"
+        return self.key_display
 
     class Meta:
         verbose_name = "System Config"
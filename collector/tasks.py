@@ -1,8 +1,9 @@
 import asyncio
+from urllib.parse import urljoin
 from celery import shared_task
 from django.utils import timezone
 from .models import Source, Article, JobConfig, Team
-from .fetchers import DataCollector, call_openrouter_ai
+from .fetchers import DataCollector, call_openrouter_ai, due_sources, fetch_article_detail
 import logging
 from django.db import transaction
 from asgiref.sync import sync_to_async
@@ -10,6 +11,8 @@ from django.db.models import Q
 
 logger = logging.getLogger(__name__)
 
+THUMBNAIL_MAX_LENGTH = Article._meta.get_field('thumbnail').max_length
+
 @shared_task
 def collect_data_from_source(source_id, team_code=None):
     """
@@ -84,19 +87,11 @@ def scheduled_collection(team_code=None):
     try:
         now = timezone.now()
 
-        # Lọc những Source cần fetch: is_active=True, và (last_fetched là NULL hoặc đã quá fetch_interval),
+        # Lọc những Source cần fetch bằng cùng điều kiện với DataCollector (chạy được trên cả SQLite),
         # thêm điều kiện team nếu team_code được truyền vào.
-        base_qs = Source.objects.filter(is_active=True)
-        if team_code:
-            base_qs = base_qs.filter(team__code=team_code)
+        source_ids = list(due_sources(now, team_code=team_code).values_list('id', flat=True))
 
-        # extra để tính điều kiện về thời gian
-        sources_due = base_qs.extra(
-            where=['last_fetched IS NULL OR (EXTRACT(EPOCH FROM %s) - EXTRACT(EPOCH FROM last_fetched)) >= fetch_interval'],
-            params=[now]
-        )
-
-        if not sources_due.exists():
+        if not source_ids:
             return {
                 'success': True,
                 'message': f'No sources due for update (team_code={team_code})',
@@ -104,10 +99,10 @@ def scheduled_collection(team_code=None):
             }
 
         results = []
-        for source in sources_due:
+        for source_id in source_ids:
             # Truyền team_code khi delay, để collect_data_from_source lọc thêm.
             results.append(
-                collect_data_from_source.delay(source.id, team_code)
+                collect_data_from_source.delay(source_id, team_code)
             )
 
         return {
@@ -123,15 +118,10 @@ def scheduled_collection(team_code=None):
 def update_article_and_config_sync(article_id, ai_content, ai_type, config_id):
     try:
         with transaction.atomic():
-            article_obj = Article.objects.select_for_update().get(id=article_id)
-            article_obj.ai_content = ai_content
-            article_obj.is_ai_processed = True
-            article_obj.ai_type = ai_type
-            article_obj.save()
-
-            config_obj = JobConfig.objects.select_for_update().get(id=config_id)
-            config_obj.last_type_sent = ai_type
-            config_obj.save()
+            Article.objects.filter(id=article_id).update(
+                ai_content=ai_content, is_ai_processed=True, ai_type=ai_type
+            )
+            JobConfig.objects.filter(id=config_id).update(last_type_sent=ai_type)
             return True
     except Exception as e:
         logger.error(f"Error updating article and config: {e}")
@@ -169,9 +159,20 @@ def process_openrouter_job(team_code=None):
         try:
             # Gọi AI
             logger.info("Step 4: Gọi call_openrouter_ai")
-            ai_content = loop.run_until_complete(
-                call_openrouter_ai(article.content, article.url, ai_type=real_team_code)
-            )
+            ai_content = ''
+            thumbnail = article.thumbnail
+            if not article.content:
+                # Feed không có nội dung đầy đủ: cào trang bài viết rồi gửi nội dung đó cho AI
+                detail = loop.run_until_complete(
+                    fetch_article_detail(article.url, ai_type=real_team_code)
+                )
+                ai_content = detail['content']
+                if detail['thumbnail']:
+                    thumbnail = urljoin(article.url, detail['thumbnail'])
+            if not ai_content:
+                ai_content = loop.run_until_complete(
+                    call_openrouter_ai(article.content, article.url, ai_type=real_team_code)
+                )
 
             # Lấy webhook
             logger.info("Step 5: Lấy webhook")
@@ -202,15 +203,12 @@ def process_openrouter_job(team_code=None):
         logger.info("Step 7: Cập nhật bài viết và config")
         try:
             with transaction.atomic():
-                article_obj = Article.objects.select_for_update().get(id=article.id)
-                article_obj.ai_content = ai_content
-                article_obj.is_ai_processed = True
-                article_obj.ai_type = real_team_code
-                article_obj.save()
-
-                config_obj = JobConfig.objects.select_for_update().get(id=config.id)
-                config_obj.last_type_sent = real_team_code
-                config_obj.save()
+                Article.objects.filter(id=article.id).update(
+                    ai_content=ai_content, is_ai_processed=True, ai_type=real_team_code,
+                    # URL ảnh dài hơn cột thumbnail thì bỏ, không cắt thành link hỏng
+                    thumbnail=thumbnail if len(thumbnail) <= THUMBNAIL_MAX_LENGTH else article.thumbnail,
+                )
+                JobConfig.objects.filter(id=config.id).update(last_type_sent=real_team_code)
         except Exception as e:
             logger.error(f"Error updating article and config: {e}")
             return {'success': False, 'error': str(e)}
@@ -1,3 +1,387 @@
-from django.test import TestCase
+import os
+import tempfile
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import orjson
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from .fetchers import (
+    SOURCE_FAILURE_THRESHOLD, DataCollector, FetchedArticle, RSSFetcher, _fixed_offset_tz, _parse_date_cached,
+    due_sources, filter_unseen_articles, mark_urls_seen, save_new_articles_sync, source_retry_at, stream_api_items,
+)
+from .models import Article, FetchLog, Source, Team, article_url_hash
+
+
+class ByteStream:
+    """Giả lập response.content của aiohttp: trả dữ liệu theo từng chunk nhỏ"""
+
+    def __init__(self, data: bytes, chunk_size: int = 64):
+        self.data = data
+        self.chunk_size = chunk_size
+        self.pos = 0
+
+    async def read(self, n: int = -1) -> bytes:
+        if n < 0:
+            n = len(self.data) - self.pos
+        chunk = self.data[self.pos:self.pos + min(n, self.chunk_size)]
+        self.pos += len(chunk)
+        return chunk
+
+    async def iter_chunked(self, n: int):
+        while chunk := await self.read(n):
+            yield chunk
+
+
+class DueSourcesTests(TestCase):
+    """due_sources lọc bằng SQL, phải cho kết quả đúng cả trên SQLite (DB mặc định)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.now = timezone.now()
+        team = Team.objects.create(code='dev', name='Dev')
+
+        def source(name, **kwargs):
+            return Source.objects.create(source=name, url=f'https://{name}.example.com/feed', type='rss',
+                                         team=team, fetch_interval=3600, **kwargs)
+
+        source('overdue', last_fetched=cls.now - timedelta(hours=2))
+        source('on_time', last_fetched=cls.now - timedelta(seconds=3600))
+        source('recent', last_fetched=cls.now - timedelta(seconds=60))
+        source('never')
+        source('forced', last_fetched=cls.now, force_collect=True)
+        source('inactive', is_active=False)
+        source('tripped', next_retry_at=cls.now + timedelta(minutes=5))
+
+    def names(self, queryset):
+        return set(queryset.values_list('source', flat=True))
+
+    def test_due_by_fetch_interval(self):
+        self.assertEqual(self.names(due_sources(self.now)), {'overdue', 'on_time', 'never', 'forced'})
+
+    def test_force_ignores_interval_and_circuit_breaker(self):
+        self.assertEqual(
+            self.names(due_sources(self.now, force=True)),
+            {'overdue', 'on_time', 'recent', 'never', 'forced', 'tripped'},
+        )
+
+    def test_team_filter(self):
+        self.assertEqual(self.names(due_sources(self.now, team_code='ba')), set())
+
+
+class ArticleUrlHashTests(TestCase):
+    """url_hash thay url làm khoá chống trùng bài viết"""
+
+    @classmethod
+    def setUpTestData(cls):
+        team = Team.objects.create(code='dev', name='Dev')
+        cls.source = Source.objects.create(source='feed', url='https://feed.example.com/rss', type='rss', team=team)
+
+    def setUp(self):
+        cache.clear()
+
+    def article(self, url, **kwargs):
+        return Article(title='t', url=url, source=self.source, published_at=timezone.now(), **kwargs)
+
+    def test_save_sets_url_hash(self):
+        article = self.article('https://example.com/a')
+        article.save()
+        article.refresh_from_db()
+        self.assertEqual(bytes(article.url_hash), article_url_hash('https://example.com/a'))
+
+    def test_validate_unique_reports_duplicate_url(self):
+        self.article('https://example.com/a').save()
+        with self.assertRaises(ValidationError) as ctx:
+            self.article('https://example.com/a').validate_unique()
+        self.assertIn('url', ctx.exception.message_dict)
+        # Chính bài đó (sửa trong admin) không bị coi là trùng
+        Article.objects.get().validate_unique()
+
+    def test_save_new_articles_skips_existing_hashes(self):
+        self.article('https://example.com/old').save()
+        now = timezone.now()
+        fetched = [
+            FetchedArticle(title=url, url=url, source='feed', published_at=now)
+            for url in ('https://example.com/old', 'https://example.com/new')
+        ]
+        self.assertEqual(save_new_articles_sync(self.source, fetched), 1)
+        self.assertEqual(
+            set(Article.objects.values_list('url', flat=True)),
+            {'https://example.com/old', 'https://example.com/new'},
+        )
+        new = Article.objects.get(url='https://example.com/new')
+        self.assertEqual(bytes(new.url_hash), article_url_hash(new.url))
+
+
+class ParseDateTests(SimpleTestCase):
+    """_parse_date_cached: fast path ISO/RFC-822, sau đó parsedate_to_datetime và feedparser"""
+
+    def test_iso_8601(self):
+        self.assertEqual(
+            _parse_date_cached('2025-05-23T21:27:59Z'),
+            datetime(2025, 5, 23, 21, 27, 59, tzinfo=dt_timezone.utc),
+        )
+        self.assertEqual(
+            _parse_date_cached('2025-05-23T21:27:59.5+07:00'),
+            datetime(2025, 5, 23, 14, 27, 59, 500000, tzinfo=dt_timezone.utc),
+        )
+
+    def test_rfc_822(self):
+        self.assertEqual(
+            _parse_date_cached('Fri, 23 May 2025 21:27:59 +0000'),
+            datetime(2025, 5, 23, 21, 27, 59, tzinfo=dt_timezone.utc),
+        )
+        # Không có thứ, không có giây
+        self.assertEqual(
+            _parse_date_cached('23 May 2025 21:27 +0700'),
+            datetime(2025, 5, 23, 14, 27, tzinfo=dt_timezone.utc),
+        )
+
+    def test_two_digit_year_falls_back_to_parsedate(self):
+        self.assertEqual(
+            _parse_date_cached('Fri, 23 May 25 21:27:59 GMT'),
+            datetime(2025, 5, 23, 21, 27, 59, tzinfo=dt_timezone.utc),
+        )
+
+    def test_rare_format_falls_back_to_feedparser(self):
+        self.assertEqual(
+            _parse_date_cached('Fri May 23 21:27:59 2025'),
+            datetime(2025, 5, 23, 21, 27, 59, tzinfo=dt_timezone.utc),
+        )
+
+    def test_strips_whitespace_and_rejects_garbage(self):
+        self.assertEqual(
+            _parse_date_cached('  2025-05-23T21:27:59Z\n'),
+            datetime(2025, 5, 23, 21, 27, 59, tzinfo=dt_timezone.utc),
+        )
+        self.assertIsNone(_parse_date_cached('not a date'))
+        self.assertIsNone(_parse_date_cached(''))
+
+
+class RFC822TimezoneTests(SimpleTestCase):
+    """Múi giờ RFC-822 dùng tzinfo dựng sẵn thay vì tạo mới cho mỗi bài"""
+
+    def test_named_timezones(self):
+        for name, hours in (('GMT', 0), ('EST', -5), ('PDT', -7)):
+            with self.subTest(name=name):
+                parsed = _parse_date_cached(f'Fri, 23 May 2025 21:27:59 {name}')
+                self.assertEqual(parsed.utcoffset(), timedelta(hours=hours))
+
+    def test_numeric_offsets_share_tzinfo(self):
+        first = _parse_date_cached('Fri, 23 May 2025 21:27:59 +0700')
+        second = _parse_date_cached('Sat, 24 May 2025 08:00:00 +0700')
+        self.assertEqual(first.utcoffset(), timedelta(hours=7))
+        self.assertIs(first.tzinfo, second.tzinfo)
+        self.assertEqual(_fixed_offset_tz('-0330').utcoffset(None), -timedelta(hours=3, minutes=30))
+
+
+RSS2_FEED = b"""<?xml version="1.0"?>
+<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/">
+<channel><title>Feed</title>
+<item><title> First </title><link>/posts/1</link><pubDate>Fri, 23 May 2025 21:27:59 +0000</pubDate>
+<description>&lt;p&gt;Hello &lt;b&gt;world&lt;/b&gt;&lt;/p&gt;</description>
+<content:encoded>&lt;p&gt;Full body&lt;/p&gt;</content:encoded></item>
+<item><title>Second</title><link>https://other.example.com/2</link><pubDate>Sat, 24 May 2025 08:00:00 +0700</pubDate></item>
+</channel></rss>"""
+
+ATOM_FEED = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Feed</title>
+<entry><title>Atom entry</title>
+<link rel="self" href="https://feed.example.com/self/1"/><link rel="alternate" href="https://feed.example.com/a/1"/>
+<updated>2025-05-23T21:27:59Z</updated><summary>Plain summary</summary></entry>
+</feed>"""
+
+# '&' không escape: lxml báo lỗi, feedparser (chế độ loose) vẫn đọc được
+MALFORMED_FEED = (
+    b'<rss version="2.0"><channel><item><title>A & B</title>'
+    b'<link>https://feed.example.com/m/1</link></item></channel></rss>'
+)
+
+
+class RSSParseStreamTests(SimpleTestCase):
+    """RSSFetcher._parse_stream: RSS 2.0 / Atom bằng lxml, XML lỗi thì fallback sang feedparser"""
+
+    def parse(self, data, **params):
+        source = Source(source='feed', url='https://feed.example.com/rss', type='rss', params=params or None)
+        return async_to_sync(RSSFetcher(source, session=None)._parse_stream)(ByteStream(data))
+
+    def test_rss2(self):
+        first, second = self.parse(RSS2_FEED)
+        self.assertEqual(first.title, 'First')
+        self.assertEqual(first.url, 'https://feed.example.com/posts/1')
+        self.assertEqual(first.published_at, datetime(2025, 5, 23, 21, 27, 59, tzinfo=dt_timezone.utc))
+        self.assertEqual(first.summary, 'Hello world')
+        self.assertEqual(first.content, '<p>Full body</p>')
+        self.assertEqual(second.url, 'https://other.example.com/2')
+        self.assertEqual(second.published_at, datetime(2025, 5, 24, 1, 0, tzinfo=dt_timezone.utc))
+
+    def test_max_entries(self):
+        self.assertEqual(len(self.parse(RSS2_FEED, max_entries=1)), 1)
+
+    def test_atom_prefers_alternate_link(self):
+        [entry] = self.parse(ATOM_FEED)
+        self.assertEqual(entry.title, 'Atom entry')
+        self.assertEqual(entry.url, 'https://feed.example.com/a/1')
+        self.assertEqual(entry.published_at, datetime(2025, 5, 23, 21, 27, 59, tzinfo=dt_timezone.utc))
+        self.assertEqual(entry.summary, 'Plain summary')
+
+    def test_malformed_xml_falls_back_to_feedparser(self):
+        [entry] = self.parse(MALFORMED_FEED)
+        self.assertEqual(entry.title, 'A & B')
+        self.assertEqual(entry.url, 'https://feed.example.com/m/1')
+
+
+class StreamApiItemsTests(SimpleTestCase):
+    """stream_api_items chỉ dựng các phần tử của mảng items/articles/data"""
+
+    def items(self, payload: bytes):
+        return async_to_sync(stream_api_items)(ByteStream(payload, chunk_size=7))
+
+    def test_builds_nested_items(self):
+        payload = (
+            b'{"meta": {"items": [1]}, "items": [{"title": "A", "tags": ["x", {"k": 1.5}]}, '
+            b'{"title": "B", "author": {"name": "n"}}]}'
+        )
+        self.assertEqual(self.items(payload), [
+            {'title': 'A', 'tags': ['x', {'k': 1.5}]},
+            {'title': 'B', 'author': {'name': 'n'}},
+        ])
+
+    def test_key_priority_and_scalars(self):
+        payload = b'{"data": ["d"], "articles": [{"title": "A"}], "items": ["u1", "u2"]}'
+        self.assertEqual(self.items(payload), ['u1', 'u2'])
+        self.assertEqual(self.items(b'{"data": ["d"], "articles": [{"title": "A"}]}'), [{'title': 'A'}])
+
+    def test_no_known_key(self):
+        self.assertEqual(self.items(b'{"results": [{"title": "A"}]}'), [])
+        self.assertEqual(self.items(b'{"items": []}'), [])
+
+
+class ImportSourcesTests(TestCase):
+    """Lệnh import_sources: tạo mới, --update (upsert), bỏ qua team không tồn tại và params sai"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.team = Team.objects.create(code='dev', name='Dev')
+
+    def run_import(self, records, **options):
+        with tempfile.NamedTemporaryFile('wb', suffix='.json', delete=False) as f:
+            f.write(orjson.dumps(records))
+        self.addCleanup(os.remove, f.name)
+        out = StringIO()
+        call_command('import_sources', f.name, stdout=out, **options)
+        return out.getvalue()
+
+    def record(self, name, **fields):
+        return {'source': name, 'url': f'https://{name}.example.com/feed', 'type': 'rss', 'team': 'dev', **fields}
+
+    def test_creates_and_skips_existing(self):
+        self.run_import([self.record('a', fetch_interval=600)])
+        out = self.run_import([self.record('a', url='https://changed.example.com'), self.record('b')])
+
+        self.assertIn('Source "a" already exists', out)
+        self.assertIn('Successfully imported 1 sources', out)
+        a = Source.objects.get(source='a')
+        self.assertEqual((a.url, a.fetch_interval), ('https://a.example.com/feed', 600))
+        self.assertTrue(Source.objects.filter(source='b', team=self.team).exists())
+
+    def test_update_upserts_and_keeps_omitted_fields(self):
+        self.run_import([self.record('a', fetch_interval=600)])
+        out = self.run_import(
+            [{'source': 'a', 'url': 'https://changed.example.com', 'team': 'dev'}, self.record('b')],
+            update=True,
+        )
+
+        self.assertIn('Successfully imported 1 new sources and updated 1 existing sources', out)
+        a = Source.objects.get(source='a')
+        self.assertEqual((a.url, a.type, a.fetch_interval), ('https://changed.example.com', 'rss', 600))
+        self.assertEqual(Source.objects.count(), 2)
+
+    def test_skips_unknown_team(self):
+        out = self.run_import([self.record('a', team='nope'), self.record('b')])
+
+        self.assertIn('Team "nope" of source "a" not found', out)
+        self.assertEqual(list(Source.objects.values_list('source', flat=True)), ['b'])
+
+    def test_validates_params(self):
+        out = self.run_import([
+            self.record('bad', type='api', params={'headers': ['x']}),
+            self.record('static', type='static'),
+        ])
+
+        self.assertIn('Invalid params of source "bad"', out)
+        self.assertFalse(Source.objects.filter(source='bad').exists())
+        # Nguồn static không có params được gán prompt mặc định như khi lưu qua admin
+        self.assertEqual(Source.objects.get(source='static').params, {'prompt': Source.DEFAULT_STATIC_PROMPT})
+
+
+class CircuitBreakerTests(TestCase):
+    """Circuit breaker: lỗi liên tiếp đủ ngưỡng thì tạm ngắt nguồn, thời gian chờ tăng gấp đôi"""
+
+    def test_source_retry_at_backoff(self):
+        now = timezone.now()
+        self.assertIsNone(source_retry_at(SOURCE_FAILURE_THRESHOLD - 1, now))
+        self.assertEqual(source_retry_at(SOURCE_FAILURE_THRESHOLD, now), now + timedelta(seconds=300))
+        self.assertEqual(source_retry_at(SOURCE_FAILURE_THRESHOLD + 1, now), now + timedelta(seconds=600))
+        self.assertEqual(source_retry_at(100, now), now + timedelta(hours=24))
+
+    def test_failures_trip_circuit(self):
+        team = Team.objects.create(code='dev', name='Dev')
+        # Type không có fetcher: FetcherFactory báo lỗi, không cần gọi mạng
+        source = Source.objects.create(source='broken', url='https://broken.example.com', type='bogus', team=team)
+        collector = DataCollector()
+
+        def collect(source):
+            with self.assertLogs('collector.fetchers', 'ERROR'):
+                return async_to_sync(collector.collect_from_source)(source)
+
+        for _ in range(SOURCE_FAILURE_THRESHOLD - 1):
+            collect(source)
+        source.refresh_from_db()
+        self.assertEqual(source.fail_streak, SOURCE_FAILURE_THRESHOLD - 1)
+        self.assertIsNone(source.next_retry_at)
+
+        log = collect(source)
+        self.assertEqual(log['status'], 'error')
+        source.refresh_from_db()
+        self.assertEqual(source.fail_streak, SOURCE_FAILURE_THRESHOLD)
+        self.assertGreater(source.next_retry_at, timezone.now())
+        self.assertEqual(FetchLog.objects.filter(source=source, status='error').count(), SOURCE_FAILURE_THRESHOLD)
+
+        now = timezone.now()
+        self.assertFalse(due_sources(now).filter(pk=source.pk).exists())
+        self.assertTrue(due_sources(now, force=True).filter(pk=source.pk).exists())
+        self.assertTrue(due_sources(source.next_retry_at).filter(pk=source.pk).exists())
+
+
+class SeenUrlCacheTests(SimpleTestCase):
+    """Cache url đã thấy: lọc bài trước khi hỏi DB, lỗi cache thì bỏ qua bộ lọc"""
+
+    def setUp(self):
+        cache.clear()
+
+    def fetched(self, *urls):
+        now = timezone.now()
+        return [FetchedArticle(title=url, url=url, source='feed', published_at=now) for url in urls]
+
+    def test_filters_marked_urls(self):
+        articles = self.fetched('https://example.com/a', 'https://example.com/b')
+        self.assertEqual(filter_unseen_articles(articles), articles)
+
+        mark_urls_seen({'https://example.com/a'})
+        self.assertEqual([a.url for a in filter_unseen_articles(articles)], ['https://example.com/b'])
+        self.assertEqual(filter_unseen_articles([]), [])
+
+    def test_cache_error_keeps_all_articles(self):
+        articles = self.fetched('https://example.com/a')
+        with mock.patch('collector.fetchers.cache') as broken_cache, self.assertLogs('collector.fetchers', 'WARNING'):
+            broken_cache.get_many.side_effect = broken_cache.set_many.side_effect = ConnectionError('down')
+            mark_urls_seen(['https://example.com/a'])
+            self.assertEqual(filter_unseen_articles(articles), articles)
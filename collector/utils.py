@@ -100,7 +100,14 @@ def get_teams_webhook_sync(team_code: str) -> Optional[str]:
         return None
 
 
-async def get_teams_webhook_async(team_code: str) -> Optional[str]:
+async def get_teams_webhook_async(team_code: str, cache_timeout: int = 300) -> Optional[str]:
+    # Webhook được đọc ở mỗi lần gọi AI; cache cả trường hợp team chưa cấu hình webhook ('') để không query lại.
+    # Lỗi DB hoặc không tìm thấy team thì không cache, lần gọi sau đọc lại DB
+    cache_key = f"teams_webhook:{team_code}"
+    value = cache.get(cache_key)
+    if value is not None:
+        return value or None
+
     try:
         # Tạo hàm đồng bộ để lấy webhook
         def get_webhook_sync():
@@ -111,7 +118,7 @@ async def get_teams_webhook_async(team_code: str) -> Optional[str]:
                     team=team,
                     is_active=True
                 ).first()
-                return config.value if config else None
+                return config.value if config else ''
             except Team.DoesNotExist:
                 logger.error(f"Team with code {team_code} not found")
                 return None
@@ -120,7 +127,10 @@ async def get_teams_webhook_async(team_code: str) -> Optional[str]:
                 return None
 
         # Gọi hàm đồng bộ trong thread riêng
-        return await asyncio.to_thread(get_webhook_sync)
+        value = await asyncio.to_thread(get_webhook_sync)
+        if value is not None:
+            cache.set(cache_key, value, cache_timeout)
+        return value or None
     except Exception as e:
         logger.error(f"Error in get_teams_webhook_async: {str(e)}")
         return None
@@ -88,6 +88,10 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Chờ tối đa 20s khi DB đang bị khoá ghi (thay vì lỗi ngay "database is locked")
+        'OPTIONS': {
+            'timeout': 20,
+        },
     }
 }
 
@@ -145,6 +149,9 @@ CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
 
+# Collector configuration
+COLLECTOR_MAX_CONCURRENCY = 20  # Số nguồn thu thập đồng thời tối đa
+
 # Logging configuration
 LOGGING = {
     'version': 1,
@@ -8,6 +8,10 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Chờ tối đa 20s khi DB đang bị khoá ghi (thay vì lỗi ngay "database is locked")
+        'OPTIONS': {
+            'timeout': 20,
+        },
     }
 }
 